@@ -2,9 +2,12 @@
 
 __all__ = ["index", "modules", "custom_doc_links", "git_url"]
 
-index = {"Criterion": "0_criteria.ipynb",
+index = {"DesignSpaceMasks": "0_criteria.ipynb",
+         "Criterion": "0_criteria.ipynb",
          "WeightedCriterion": "0_criteria.ipynb",
          "CombinedCriterion": "0_criteria.ipynb",
+         "CriterionMemo": "0_criteria.ipynb",
+         "CriterionEvaluationPlan": "0_criteria.ipynb",
          "SupervisedCriterion": "1_supervised_criteria.ipynb",
          "WeightedBCE": "1_supervised_criteria.ipynb",
          "WeightedFocal": "1_supervised_criteria.ipynb",
@@ -23,6 +26,8 @@ index = {"Criterion": "0_criteria.ipynb",
          "ForcesUnderpinned": "2_unsupervised_criteria.ipynb",
          "MaxStress": "2_unsupervised_criteria.ipynb",
          "StressConstraint": "2_unsupervised_criteria.ipynb",
+         "AggregatedVonMisesStress": "2_unsupervised_criteria.ipynb",
+         "AggregatedStress": "2_unsupervised_criteria.ipynb",
          "Fail": "2_unsupervised_criteria.ipynb",
          "StressEfficiency": "2_unsupervised_criteria.ipynb",
          "Binariness": "2_unsupervised_criteria.ipynb",
@@ -34,14 +39,20 @@ index = {"Criterion": "0_criteria.ipynb",
          "CSVDataset": "3_csv_dataset.ipynb",
          "SELTODataset": "4_selto_dataset.ipynb",
          "SIMPDataset": "5_simp_dataset.ipynb",
+         "SIMPSamples": "5_simp_dataset.ipynb",
+         "TrajectorySIMPSamples": "5_simp_dataset.ipynb",
+         "ShardedSIMPSamples": "5_simp_dataset.ipynb",
          "DensityFilter": "0_density_filters.ipynb",
          "MaxPoolDensityFilter": "0_density_filters.ipynb",
          "ConvolutionDensityFilter": "0_density_filters.ipynb",
          "UniformDensityFilter": "0_density_filters.ipynb",
          "RadialDensityFilter": "0_density_filters.ipynb",
+         "HelmholtzSolve": "0_density_filters.ipynb",
+         "HelmholtzDensityFilter": "0_density_filters.ipynb",
          "DensityRepresenter": "1_density_representer.ipynb",
          "FilteringDensityRepresenter": "2_filtering_density_representer.ipynb",
          "filter_fcts": "2_filtering_density_representer.ipynb",
+         "BatchedFilteringDensityRepresenter": "2_filtering_density_representer.ipynb",
          "DeepImagePriorDensityRepresenter": "3_deep_image_prior_density_representer.ipynb",
          "ConvolutionalBlock": "0_conv_block.ipynb",
          "EncodingBlock": "1_encoder.ipynb",
@@ -56,12 +67,15 @@ index = {"Criterion": "0_criteria.ipynb",
          "AutogradLinearSolver": "0_linear_solvers.ipynb",
          "LinearSolver": "0_linear_solvers.ipynb",
          "SparseLinearSolver": "0_linear_solvers.ipynb",
+         "SubdomainWorkers": "0_linear_solvers.ipynb",
+         "DomainDecompositionLinearSolver": "0_linear_solvers.ipynb",
          "PDESolver": "1_pde_solver.ipynb",
          "FDMDerivatives": "2_fdm_derivatives.ipynb",
          "FDMAdjointDerivatives": "2_fdm_derivatives.ipynb",
          "FDMAssembly": "3_fdm_assembly.ipynb",
          "UnpaddedFDM": "4_unpadded_fdm.ipynb",
          "FDM": "5_fdm_solver.ipynb",
+         "ReducedOrderPDESolver": "6_reduced_order_pde_solver.ipynb",
          "Voxels": "3d_plotting.ipynb",
          "plot_scalar_field": "3d_plotting.ipynb",
          "pyvista_plot_scalar_field": "3d_plotting.ipynb",
@@ -83,16 +97,30 @@ index = {"Criterion": "0_criteria.ipynb",
          "add_corners": "0_plotting_for_solution.ipynb",
          "PlottingForSolution": "0_plotting_for_solution.ipynb",
          "Solution": "1_solution.ipynb",
+         "StreamingAccumulator": "0_eval_module.ipynb",
          "EvalModule": "0_eval_module.ipynb",
          "TrainModuleVerboseUtils": "1_training_module.ipynb",
          "EpochLossGetter": "1_training_module.ipynb",
          "TrainModule": "1_training_module.ipynb",
          "TopoSolver": "2_topo_solver.ipynb",
+         "describe_config": "2_topo_solver.ipynb",
+         "describe_constructor_args": "2_topo_solver.ipynb",
+         "ResultCache": "2_topo_solver.ipynb",
          "TrivialSolver": "3_trivial_solver.ipynb",
          "SIMPIterator": "4_simp_iterator.ipynb",
+         "BatchedSIMPIterator": "4_simp_iterator.ipynb",
+         "UpdateRule": "4_simp_iterator.ipynb",
+         "AdamUpdateRule": "4_simp_iterator.ipynb",
+         "LatentDensityUpdateRule": "4_simp_iterator.ipynb",
+         "OCUpdateRule": "4_simp_iterator.ipynb",
+         "MMAUpdateRule": "4_simp_iterator.ipynb",
+         "SIMPLoggingPolicy": "4_simp_iterator.ipynb",
          "SIMP": "5_simp.ipynb",
+         "SIMPCheckpointer": "5_simp.ipynb",
+         "SIMPTrajectory": "5_simp.ipynb",
          "OracleSolver": "6_oracle_topo_solver.ipynb",
          "TrainableTopoSolver": "7_trainable_topo_solver.ipynb",
+         "label_connected_components": "infection.ipynb",
          "infect": "infection.ipynb",
          "get_current_datetime_as_string": "utils.ipynb",
          "create_dir": "utils.ipynb",
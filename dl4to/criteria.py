@@ -1,18 +1,49 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: notebooks/criteria/2_unsupervised_criteria.ipynb (unless otherwise specified).
 
-__all__ = ['Criterion', 'WeightedCriterion', 'CombinedCriterion', 'SupervisedCriterion', 'WeightedBCE', 'WeightedFocal',
-           'Dice', 'Tversky', 'FocalTversky', 'IoU', 'VoxelAccuracy', 'BalancedVoxelAccuracy', 'L2Accuracy',
-           'UnsupervisedCriterion', 'Compliance', 'Volume', 'VolumeFraction', 'VolumeConstraint', 'ForcesUnderpinned',
-           'MaxStress', 'StressConstraint', 'Fail', 'StressEfficiency', 'Binariness']
+__all__ = ['Criterion', 'WeightedCriterion', 'CombinedCriterion', 'CriterionEvaluationPlan', 'SupervisedCriterion',
+           'WeightedBCE', 'WeightedFocal', 'Dice', 'Tversky', 'FocalTversky', 'IoU', 'VoxelAccuracy',
+           'BalancedVoxelAccuracy', 'L2Accuracy', 'UnsupervisedCriterion', 'Compliance', 'Volume', 'VolumeFraction',
+           'VolumeConstraint', 'ForcesUnderpinned', 'MaxStress', 'StressConstraint', 'AggregatedStress', 'Fail',
+           'StressEfficiency', 'Binariness']
 
 # Cell
 import torch
+import weakref
+from contextlib import contextmanager
+
+# Internal Cell
+class DesignSpaceMasks:
+    """
+    Caches the flattened design space mask and the number of design space voxels for each problem, such that they are shared between criteria and epochs.
+    A cached mask is rebuilt if `problem.Ω_design` has been replaced or modified in-place.
+    """
+    def __init__(self):
+        self._masks = weakref.WeakKeyDictionary()
+
+
+    def get(self,
+            problem:"dl4to.problem.Problem", # The problem for which the mask is returned.
+            device:torch.device # The device on which the mask is returned.
+           ):
+        """
+        Returns the flattened design space mask of `problem` and the number of voxels that it contains.
+        """
+        Ω_design = problem.Ω_design
+        key = (Ω_design._version, torch.device(device))
+        cached = self._masks.get(problem)
+        if cached is None or cached[0] is not Ω_design or cached[1] != key:
+            mask = (Ω_design.flatten() == -1).to(device)
+            cached = (Ω_design, key, mask, mask.sum())
+            self._masks[problem] = cached
+        return cached[2], cached[3]
 
 # Cell
 class Criterion():
     """
     A parent class that inherits all criteria for both classical and learned methods. Criteria can be used as objective or loss functions, as well as evaluation metrics.
     """
+    design_space_masks = DesignSpaceMasks()
+
     def __init__(
         self,
         name:str, # The name of this criterion which will be monitored in logging.
@@ -53,10 +84,17 @@ class Criterion():
                    binary:bool=False # Whether the densities should be binarized.
                   ):
         """
-        Returns a flattened density distribution tensor from the passed solutions.
+        Returns a flattened density distribution tensor from the passed solutions. While a criterion tree is evaluated, the tensor is shared between all criteria that request it.
         """
+        memo = CriterionMemo.active
+        key = ('θ_flat', tuple((id(solution.θ), solution.θ._version) for solution in solutions), binary)
+        if memo is not None and key in memo.values:
+            return memo.values[key]
+
         θ = torch.stack([solution.get_θ(binary=binary).flatten() for solution in solutions])
         θ.clamp_(0,1)
+        if memo is not None:
+            memo.values[key] = θ
         return θ
 
 
@@ -68,12 +106,26 @@ class Criterion():
         """
         device = solutions[0].get_θ().device
         if self.compute_only_on_design_space:
-            return torch.stack([solution.problem.Ω_design.flatten() == -1 for solution in solutions]).to(device)
+            return torch.stack([self.design_space_masks.get(solution.problem, device)[0] for solution in solutions])
         else:
             shape_flat = torch.numel(solutions[0].get_θ())
             return torch.ones(len(solutions), shape_flat, dtype=torch.bool).to(device)
 
 
+    def get_design_space_voxel_counts(self,
+                                      solutions:list # A list of solutions for which the number of voxels in the design space mask is returned.
+                                     ):
+        """
+        Returns the number of voxels in the design space mask of each solution. Equivalent to `get_design_space_mask(solutions).sum(dim=1)`, but uses precomputed counts.
+        """
+        device = solutions[0].get_θ().device
+        if self.compute_only_on_design_space:
+            return torch.stack([self.design_space_masks.get(solution.problem, device)[1] for solution in solutions])
+        else:
+            shape_flat = torch.numel(solutions[0].get_θ())
+            return torch.full((len(solutions),), shape_flat, dtype=torch.int64, device=device)
+
+
     def __call__(self,
                  solutions:list, # The solutions that should be evaluated with the criterion.
                  gt_solutions:list=None, # Ground truth solutions that are compared element-wise with the `solutions`. Only used if `Criterion.supervised=True`.
@@ -104,6 +156,25 @@ class Criterion():
         return WeightedCriterion(self, λ)
 
 
+    def _get_signature(self):
+        return (type(self).__name__,) + tuple((key, _get_hashable(value)) for key, value in sorted(vars(self).items()))
+
+
+    def _get_memo_key(self, solutions, gt_solutions, binary):
+        if type(solutions) not in [list, tuple]:
+            solutions = [solutions]
+        if type(gt_solutions) not in [list, tuple]:
+            gt_solutions = [gt_solutions]
+        return (self._get_signature(), tuple(map(id, solutions)), tuple(map(id, gt_solutions)), binary)
+
+
+    def _evaluate(self, solutions, gt_solutions=None, binary=False):
+        memo = CriterionMemo.active
+        if memo is None:
+            return self(solutions, gt_solutions, binary)
+        return memo.get(self, solutions, gt_solutions, binary)
+
+
     def __mul__(self,
                  λ:float # The multiplier which the criterion is weighted with.
                 ):
@@ -143,7 +214,7 @@ class WeightedCriterion(Criterion):
         """
         Calculates the output of the criterion for all solutions. The gt_solutions are only used if `self.criterion.supervised=True`.
         """
-        return self.λ * self.criterion(solutions, gt_solutions, binary)
+        return CriterionEvaluationPlan(self)(solutions, gt_solutions, binary)
 
 # Cell
 class CombinedCriterion(Criterion):
@@ -180,8 +251,98 @@ class CombinedCriterion(Criterion):
         """
         Calculates the output of the criterion for all solutions. The gt_solutions are only used if `self.criterion.supervised=True`.
         """
-        criterion1_vals = self.criterion1(solutions, gt_solutions, binary)
-        criterion2_vals = self.criterion2(solutions, gt_solutions, binary)
+        return CriterionEvaluationPlan(self)(solutions, gt_solutions, binary)
+
+# Internal Cell
+def _get_hashable(value):
+    if isinstance(value, Criterion):
+        return value._get_signature()
+    if isinstance(value, (list, tuple)):
+        return tuple(_get_hashable(entry) for entry in value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return id(value)
+
+# Internal Cell
+class CriterionMemo:
+    """
+    Stores the outputs of criteria that have already been evaluated on a batch of solutions. Criteria are identified by their class and configuration, such that identical sub-criteria are only evaluated once.
+    """
+    active = None
+
+    def __init__(self):
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+
+
+    def get(self, criterion, solutions, gt_solutions, binary):
+        key = criterion._get_memo_key(solutions, gt_solutions, binary)
+        if key in self.values:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.values[key] = criterion(solutions, gt_solutions, binary)
+        return self.values[key]
+
+
+    @staticmethod
+    @contextmanager
+    def scope():
+        if CriterionMemo.active is not None:
+            yield CriterionMemo.active
+            return
+        CriterionMemo.active = CriterionMemo()
+        try:
+            yield CriterionMemo.active
+        finally:
+            CriterionMemo.active = None
+
+# Cell
+class CriterionEvaluationPlan:
+    """
+    Walks a tree of `dl4to.criteria.CombinedCriterion` and `dl4to.criteria.WeightedCriterion` objects and evaluates each distinct leaf criterion exactly once per batch of solutions.
+    Sub-criteria that are shared between leaves, e.g., the `ForcesUnderpinned` criterion inside of `MaxStress` and `Fail`, are deduplicated as well.
+    The unique leaf criteria can be accessed via `self.leaves`. Building a plan is cheap, since the tree is only walked when the plan is evaluated.
+    """
+    def __init__(self,
+                 criterion:"dl4to.criteria.Criterion" # The root of the criterion tree.
+                ):
+        self.criterion = criterion
+
+
+    @property
+    def leaves(self):
+        """
+        Returns the distinct leaf criteria of the tree. Only meant for inspection, since deduplication during evaluation is done by the criterion memo.
+        """
+        leaves = []
+        signatures = set()
+        for leaf in self._get_leaves(self.criterion):
+            signature = leaf._get_signature()
+            if signature not in signatures:
+                signatures.add(signature)
+                leaves.append(leaf)
+        return leaves
+
+
+    def _get_leaves(self, criterion):
+        if isinstance(criterion, CombinedCriterion):
+            return self._get_leaves(criterion.criterion1) + self._get_leaves(criterion.criterion2)
+        if isinstance(criterion, WeightedCriterion):
+            return self._get_leaves(criterion.criterion)
+        return [criterion]
+
+
+    def _fold(self, criterion, solutions, gt_solutions, binary):
+        if isinstance(criterion, WeightedCriterion):
+            return criterion.λ * self._fold(criterion.criterion, solutions, gt_solutions, binary)
+
+        if not isinstance(criterion, CombinedCriterion):
+            return criterion._evaluate(solutions, gt_solutions, binary)
+
+        criterion1_vals = self._fold(criterion.criterion1, solutions, gt_solutions, binary)
+        criterion2_vals = self._fold(criterion.criterion2, solutions, gt_solutions, binary)
         if criterion1_vals.device != criterion2_vals.device:
             if criterion1_vals.device == torch.device('cpu'):
                 criterion1_vals = criterion1_vals.to(criterion2_vals.device)
@@ -189,6 +350,18 @@ class CombinedCriterion(Criterion):
                 criterion2_vals = criterion2_vals.to(criterion1_vals.device)
         return criterion1_vals + criterion2_vals
 
+
+    def __call__(self,
+                 solutions:list, # The solutions that should be evaluated with the criterion.
+                 gt_solutions:list=None, # Ground truth solutions that are compared element-wise with the `solutions`. Only used if `Criterion.supervised=True`.
+                 binary:bool=False # Whether the criterion should be evaluated on binarized densities. Does not have an effect on some criteria.
+                ):
+        """
+        Evaluates the criterion tree for all solutions. Returns the same values as calling the root criterion directly.
+        """
+        with CriterionMemo.scope():
+            return self._fold(self.criterion, solutions, gt_solutions, binary)
+
 # Cell
 import torch
 import numpy as np
@@ -308,8 +481,7 @@ class WeightedBCE(SupervisedCriterion):
         """
         gt_solutions = dataset.get_gt_solutions()
         θ = torch.stack([gt_solution.get_θ(binary=binary).flatten() for gt_solution in gt_solutions])
-        design_space_mask = self.get_design_space_mask(gt_solutions)
-        self.weight = 1. - θ.sum() / design_space_mask.sum()
+        self.weight = 1. - θ.sum() / self.get_design_space_voxel_counts(gt_solutions).sum()
         print(f"Setting criterion weight to {self.weight}.")
         self._name = f'BCE({self.weight:.2})'
 
@@ -365,8 +537,7 @@ class WeightedFocal(SupervisedCriterion):
         """
         gt_solutions = dataset.get_gt_solutions()
         θ = torch.stack([gt_solution.get_θ(binary=binary).flatten() for gt_solution in gt_solutions])
-        design_space_mask = self.get_design_space_mask(gt_solutions)
-        self.weight = 1. - θ.sum() / design_space_mask.sum()
+        self.weight = 1. - θ.sum() / self.get_design_space_voxel_counts(gt_solutions).sum()
         print(f"Setting criterion weight to {self.weight}.")
         self._name = f'BCE({self.weight:.2})'
 
@@ -663,7 +834,7 @@ class L2Accuracy(SupervisedCriterion):
         θ_true = self.get_θ_flat(gt_solutions, binary=binary)
         design_space_mask = self.get_design_space_mask(solutions)
         loss = mse_loss(θ * design_space_mask, θ_true * design_space_mask, reduction='none')
-        return 1 - torch.sqrt(loss.sum(dim=1) / design_space_mask.sum(dim=1) + self.ε)
+        return 1 - torch.sqrt(loss.sum(dim=1) / self.get_design_space_voxel_counts(solutions) + self.ε)
 
 # Cell
 import warnings
@@ -671,8 +842,8 @@ import torch
 import numpy as np
 from torch.nn.functional import relu, softplus
 
-from .utils import infect
-from .criteria import Criterion
+from .utils import label_connected_components
+from .criteria import Criterion, CriterionMemo
 
 # Cell
 class UnsupervisedCriterion(Criterion):
@@ -797,9 +968,8 @@ class VolumeFraction(UnsupervisedCriterion):
         Calculates the output of the criterion for all solutions.
         """
         solutions = self._convert_to_list(solutions)
-        volume = self.volume_crit(solutions, gt_solutions, binary)
-        design_space_mask = self.get_design_space_mask(solutions)
-        return volume / design_space_mask.sum(dim=1)
+        volume = self.volume_crit._evaluate(solutions, gt_solutions, binary)
+        return volume / self.get_design_space_voxel_counts(solutions)
 
 # Cell
 class VolumeConstraint(UnsupervisedCriterion):
@@ -844,8 +1014,9 @@ class VolumeConstraint(UnsupervisedCriterion):
 # Cell
 class ForcesUnderpinned(UnsupervisedCriterion):
     """
-    This criterion uses an infection algorithm to check if all voxels that have external forces applied to them are connected to the rest of the structure.
+    This criterion labels the connected components of the structure to check if all voxels that have external forces applied to them are connected to the rest of the structure.
     Returns 1 if the structure is connected, else it returns 0.
+    Solutions of the same shape are stacked and labeled together in a single pass, with the batch dimension treated as disconnected.
     """
     def __init__(self):
         super().__init__(
@@ -854,23 +1025,27 @@ class ForcesUnderpinned(UnsupervisedCriterion):
             compute_only_on_design_space=False)
 
 
-    def _one_channel_are_forces_underpinned(self, forces, dirichlet, density):
+    def _one_channel_are_forces_underpinned(self, forces, dirichlet, density, labels):
         assert dirichlet.dtype == density.dtype, f"{dirichlet.dtype} != {density.dtype}"
         assert dirichlet.device == density.device, f"{dirichlet.device} != {density.device}"
 
-        underpinned = infect(dirichlet, density)
-        underpinned_forces = underpinned & forces
-        return torch.all(underpinned_forces == forces).item()
+        underpinned_labels = torch.unique(labels[dirichlet & density])
+        forces_underpinned = torch.isin(labels, underpinned_labels[underpinned_labels > 0]) | ~forces
+        return forces_underpinned.flatten(start_dim=1).all(dim=1)
 
 
     def _are_forces_underpinned(self, F, Ω_dirichlet, θ):
-        underpinned = True
+        labels = label_connected_components(θ[:, 0])
+        underpinned = torch.ones(len(θ), dtype=torch.bool, device=θ.device)
         for i in range(3):
-            if not self._one_channel_are_forces_underpinned(F[i], Ω_dirichlet[i], θ[0]):
-                underpinned = False
+            underpinned &= self._one_channel_are_forces_underpinned(F[:, i], Ω_dirichlet[:, i], θ[:, 0], labels)
         return underpinned
 
 
+    def _get_memo_key(self, solutions, gt_solutions, binary):
+        return super()._get_memo_key(solutions, gt_solutions, binary=True)
+
+
     def __call__(self,
                  solutions:list, # The solutions that should be evaluated with the criterion.
                  gt_solutions:list=None, # Ground truth solutions that are compared element-wise with the `solutions`. Since the criterion is unsupervised this does not have an effect.
@@ -880,22 +1055,24 @@ class ForcesUnderpinned(UnsupervisedCriterion):
         Calculates the output of the criterion for all solutions.
         """
         solutions = self._convert_to_list(solutions)
-        results = []
         if binary == False:
             warnings.warn("Automatically setting binary=True for ForcesUnderpinned Criterion.")
             binary = True
-        for solution in solutions:
-            θ = solution.get_θ(binary=binary) == 1
-            F = solution.problem.F != 0
-            Ω_dirichlet = solution.problem.Ω_dirichlet
 
-            F = F.type(θ.dtype).to(θ.device)
-            Ω_dirichlet = Ω_dirichlet.type(θ.dtype).to(θ.device)
+        indices_per_shape = {}
+        for i, solution in enumerate(solutions):
+            indices_per_shape.setdefault(tuple(solution.shape), []).append(i)
 
-            underpinned = self._are_forces_underpinned(F, Ω_dirichlet, θ)
-            results.append(underpinned)
+        device = solutions[0].get_θ().device
+        results = torch.zeros(len(solutions), dtype=torch.bool, device=device)
+        for indices in indices_per_shape.values():
+            θ = torch.stack([solutions[i].get_θ(binary=binary) == 1 for i in indices]).to(device)
+            F = torch.stack([solutions[i].problem.F != 0 for i in indices]).to(device)
+            Ω_dirichlet = torch.stack([solutions[i].problem.Ω_dirichlet for i in indices])
+            Ω_dirichlet = Ω_dirichlet.type(θ.dtype).to(device)
+            results[indices] = self._are_forces_underpinned(F, Ω_dirichlet, θ)
 
-        return torch.tensor(results, dtype=torch.float32, device=θ.device)
+        return results.float()
 
 # Cell
 class MaxStress(UnsupervisedCriterion):
@@ -926,7 +1103,7 @@ class MaxStress(UnsupervisedCriterion):
         """
         solutions = self._convert_to_list(solutions)
         if self.compute_only_for_not_underpinned:
-            forces_underpinned = self.forces_underpinned_crit(solutions, gt_solutions, binary)
+            forces_underpinned = self.forces_underpinned_crit._evaluate(solutions, gt_solutions, binary)
         else:
             forces_underpinned = len(solutions) * [1.]
 
@@ -985,6 +1162,118 @@ class StressConstraint(UnsupervisedCriterion):
         approximately_only_positives = self.threshold_fct(positives_are_too_large)
         return (approximately_only_positives ** 2).mean(dim=[1,2,3,4]) / 2
 
+# Internal Cell
+class AggregatedVonMisesStress(torch.autograd.Function):
+    """
+    Aggregates the von Mises stresses of a 9-channel stress tensor `σ` into a single smooth approximation of their maximum.
+    The gradient with respect to `σ` is evaluated in closed form in a single fused expression instead of back-propagating through the von Mises stress computation.
+    """
+    @staticmethod
+    def _get_σ_vm(σ, ε=1e-9):
+        return (.5 * ((σ[0] - σ[4]) ** 2
+                    + (σ[4] - σ[8]) ** 2
+                    + (σ[8] - σ[0]) ** 2
+                    + 6 * (σ[1] ** 2 + σ[2] ** 2 + σ[5] ** 2)
+                     ) + ε
+               ) ** .5
+
+
+    @staticmethod
+    def forward(ctx, σ, σ_ys, exponent, aggregation):
+        σ_vm = AggregatedVonMisesStress._get_σ_vm(σ.detach())
+        r = σ_vm.flatten() / σ_ys
+        r_max = r.max()
+        if aggregation == 'p_norm':
+            mean_power = ((r / r_max) ** exponent).mean()
+            value = r_max * mean_power ** (1 / exponent)
+            weights = (r / r_max) ** (exponent - 1) / (r.numel() * mean_power ** (1 - 1 / exponent))
+        else:
+            value = r_max + torch.log(torch.exp(exponent * (r - r_max)).mean()) / exponent
+            weights = torch.softmax(exponent * r, dim=0)
+
+        ctx.save_for_backward(σ, σ_vm, weights.view(σ_vm.shape))
+        ctx.σ_ys = σ_ys
+        return value
+
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        σ, σ_vm, weights = ctx.saved_tensors
+        g = grad_output * weights / (ctx.σ_ys * σ_vm)
+        grad_σ = torch.zeros_like(σ)
+        grad_σ[0] = g * (2 * σ[0] - σ[4] - σ[8]) / 2
+        grad_σ[4] = g * (2 * σ[4] - σ[0] - σ[8]) / 2
+        grad_σ[8] = g * (2 * σ[8] - σ[0] - σ[4]) / 2
+        grad_σ[1] = g * 3 * σ[1]
+        grad_σ[2] = g * 3 * σ[2]
+        grad_σ[5] = g * 3 * σ[5]
+        return grad_σ, None, None, None
+
+# Cell
+class AggregatedStress(UnsupervisedCriterion):
+    """
+    This criterion solves the PDE for linear elasticity and aggregates the von Mises stresses, normalized with the yield stress, into a smooth approximation of their maximum.
+    The aggregation is either a p-norm or a Kreisselmeier-Steinhauser (KS) function. Its gradient is computed in closed form, such that back-propagation only requires the single adjoint solve of the PDE solver for each solution.
+    If `adaptive_scaling=True`, then the aggregate is rescaled with the detached ratio between the true maximum and the aggregate, such that the criterion returns the maximum von Mises stress with the gradient of the aggregate.
+    The exponent of the aggregation is increased by `exponent_growth` after every evaluation in which the aggregate underestimates the maximum by more than `tolerance`, until `max_exponent` is reached.
+    Only evaluations with gradients enabled and non-binary densities update the exponent, such that evaluations for logging or validation do not change the objective of later optimization steps.
+    """
+    def __init__(self,
+                 aggregation:str='p_norm', # The aggregation function. Can be either "p_norm" or "ks".
+                 exponent:float=8., # The initial exponent of the p-norm or the initial parameter of the KS function. Larger values approximate the maximum more closely but lead to less smooth gradients.
+                 max_exponent:float=32., # The largest exponent that is reached by the adaptive schedule.
+                 exponent_growth:float=1.5, # The factor by which the exponent is increased. A value of 1 disables the adaptive schedule.
+                 tolerance:float=.05, # The relative gap between the maximum and the aggregate above which the exponent is increased.
+                 adaptive_scaling:bool=True # Whether the aggregate is rescaled such that its value matches the maximum von Mises stress.
+                ):
+        super().__init__(
+            name=f'aggregated_stress',
+            compute_only_on_design_space=False
+        )
+        if aggregation not in ['p_norm', 'ks']:
+            raise ValueError("`aggregation` must be one of ['p_norm', 'ks'].")
+        self.aggregation = aggregation
+        self.exponent = exponent
+        self.max_exponent = max_exponent
+        self.exponent_growth = exponent_growth
+        self.tolerance = tolerance
+        self.adaptive_scaling = adaptive_scaling
+
+
+    def update_exponent(self,
+                        max_ratio:float # The largest ratio between the maximum von Mises stress and its aggregate among the evaluated solutions.
+                       ):
+        """
+        Increases the exponent by `exponent_growth` if `max_ratio` exceeds `1 + tolerance`, until `max_exponent` is reached.
+        """
+        if max_ratio > 1 + self.tolerance:
+            self.exponent = min(self.exponent * self.exponent_growth, self.max_exponent)
+
+
+    def __call__(self,
+                 solutions:list, # The solutions that should be evaluated with the criterion.
+                 gt_solutions:list=None, # Ground truth solutions that are compared element-wise with the `solutions`. Since the criterion is unsupervised this does not have an effect.
+                 binary:bool=False # Whether the criterion should be evaluated on binarized densities. Does not have an effect on some criteria.
+                  ):
+        """
+        Calculates the output of the criterion for all solutions.
+        """
+        solutions = self._convert_to_list(solutions)
+        aggregated_stresses = []
+        max_ratios = []
+        for solution in solutions:
+            u, σ, σ_vm = solution.solve_pde(binary=binary)
+            aggregated_stress = AggregatedVonMisesStress.apply(σ, solution.problem.σ_ys, self.exponent, self.aggregation)
+            max_ratio = (σ_vm.max() / solution.problem.σ_ys).detach() / aggregated_stress.detach()
+            if self.adaptive_scaling:
+                aggregated_stress = max_ratio * aggregated_stress
+            aggregated_stresses.append(aggregated_stress)
+            max_ratios.append(max_ratio)
+
+        if torch.is_grad_enabled() and not binary:
+            self.update_exponent(torch.stack(max_ratios).max().item())
+        return torch.stack(aggregated_stresses)
+
 # Cell
 class Fail(UnsupervisedCriterion):
     """
@@ -1013,8 +1302,9 @@ class Fail(UnsupervisedCriterion):
         Calculates the output of the criterion for all solutions.
         """
         solutions = self._convert_to_list(solutions)
-        failed_due_to_max_stress = (self.max_stress_crit(solutions, gt_solutions, binary=binary) > 1 + self.ε).float()
-        failed_total = (~self.forces_underpinned_crit(solutions, gt_solutions, binary=True).bool()).float()
+        with CriterionMemo.scope():
+            failed_due_to_max_stress = (self.max_stress_crit._evaluate(solutions, gt_solutions, binary=binary) > 1 + self.ε).float()
+            failed_total = (~self.forces_underpinned_crit._evaluate(solutions, gt_solutions, binary=True).bool()).float()
         failed_total.cpu()[failed_total == 0.] = failed_due_to_max_stress
 
         return failed_total
@@ -1047,7 +1337,7 @@ class StressEfficiency(UnsupervisedCriterion):
         """
         solutions = self._convert_to_list(solutions)
         if self.compute_only_for_not_underpinned:
-            forces_underpinned = self.forces_underpinned_crit(solutions, gt_solutions, binary)
+            forces_underpinned = self.forces_underpinned_crit._evaluate(solutions, gt_solutions, binary)
         else:
             forces_underpinned = len(solutions) * [1.]
 
@@ -1097,4 +1387,4 @@ class Binariness(UnsupervisedCriterion):
             torch.tensor([1.], device=θ.device),
             torch.tensor([0.], device=θ.device)
         )
-        return θ_design_filtered.sum(dim=1) / design_space_mask.sum(dim=1)
\ No newline at end of file
+        return θ_design_filtered.sum(dim=1) / self.get_design_space_voxel_counts(solutions)
\ No newline at end of file
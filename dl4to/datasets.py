@@ -905,27 +905,62 @@ class SELTODataset(CSVDataset):
         }
 
 # Internal Cell
+import os
+import json
+import hashlib
 import torch
 import numpy as np
+import multiprocessing
 from copy import deepcopy
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
 
+from .solution import Solution
 from .datasets import TopoDataset
+from .topo_solvers import SIMPTrajectory
 
 # Cell
 
 class SIMPDataset(TopoDataset):
-    def __init__(self, problems, simp, name=None, verbose=True):
+    """
+    A dataset that contains the SIMP trajectories of the given problems, i.e., all intermediate SIMP solutions of each problem.
+    If `root` is given, the trajectories are streamed to one shard file per problem and the dataset is opened lazily from the shards via a manifest.
+    The manifest identifies the problems and the SIMP configuration, and every completed shard is appended to a completion log. Therefore, an interrupted generation resumes where it stopped when the dataset is created again with the same `root`, problems and SIMP configuration.
+    If SIMP is configured with `trajectory_options`, then the densities are kept in the compact form of `SIMPTrajectory` and the solutions are only reconstructed when they are accessed.
+    The SIMP solutions of a problem carry the final logs of its SIMP run as `solution.logs`, which are stored in the shard with their tensor values converted to floats.
+    """
+    def __init__(self,
+                 problems:list, # The problems for which the SIMP trajectories are generated.
+                 simp:"dl4to.topo_solvers.SIMP", # The SIMP topo solver. Needs to return intermediate solutions.
+                 name:str=None, # The name of the dataset.
+                 verbose:bool=True, # Whether to give the user feedback on the progress.
+                 root:str=None, # The directory in which the shards and the manifest are stored. If `None`, then all trajectories are kept in memory.
+                 n_workers:int=0, # The number of worker processes among which the problems are distributed. Only has an effect if `root` is given. If `n_workers=0`, then all problems are solved in the main process.
+                 n_cached_shards:int=16 # The number of most recently used shards that are kept in memory. Only has an effect if `root` is given.
+                ):
         self.problems = problems
         self.simp = simp
+        self.root = root
+        self.n_workers = n_workers
+        self.n_cached_shards = n_cached_shards
         assert self.simp.return_intermediate_solutions == True
-        dataset = self._generate_dataset()
+        if root is None:
+            dataset = self._generate_dataset()
+        else:
+            manifest = self._generate_shards(verbose)
+            dataset = self._open_shards(manifest)
         super().__init__(dataset=dataset,
                          name=name,
                          verbose=verbose)
 
 
     def _generate_dataset(self):
+        if self.simp.trajectory_options is not None:
+            trajectories = [self.simp(problems_or_solutions=problem) for problem in self.problems]
+            return self._index_samples(TrajectorySIMPSamples(self.problems, trajectories))
+
         self.list_of_problems_and_orig_solution_indices = defaultdict(list)
         dataset = []
         i_problem = 0
@@ -934,13 +969,170 @@ class SIMPDataset(TopoDataset):
             dataset.append((problem, 0.5*problem.trivial_solution))
             solutions = self.simp(problems_or_solutions=problem)
             for solution in solutions:
-                dataset.append((problem, solution.detach()))
+                sample = solution.detach()
+                sample.logs = getattr(solution, 'logs', None)
+                dataset.append((problem, sample))
                 self.list_of_problems_and_orig_solution_indices[i_problem].append(len(dataset)-1)
             i_problem += 1
         return dataset
 
 
-    def augment(self, pde_solver, max_augmentation_per_problem=5, threshold=1e-3):
+    @property
+    def manifest_path(self):
+        return os.path.join(self.root, 'manifest.json')
+
+
+    @property
+    def completion_log_path(self):
+        return os.path.join(self.root, 'completed_shards.jsonl')
+
+
+    @staticmethod
+    def _get_shard_file_name(i_problem):
+        return f'shard_{i_problem:06d}.pt'
+
+
+    @staticmethod
+    def _get_storable_logs(logs):
+        if logs is None:
+            return None
+        def to_storable(value):
+            if isinstance(value, torch.Tensor):
+                return value.item() if value.numel() == 1 else value.tolist()
+            return value
+        return {name: [to_storable(entry) for entry in value] if isinstance(value, list) else to_storable(value) for name, value in logs.items()}
+
+
+    @staticmethod
+    def _write_shard(simp, root, i_problem, problem):
+        solutions = simp(problems_or_solutions=problem)
+        if isinstance(solutions, SIMPTrajectory):
+            shard = {**solutions.state_dict(), 'logs': SIMPDataset._get_storable_logs(solutions.logs)}
+        else:
+            shard = {'θ': torch.stack([solution.θ.detach() for solution in solutions]),
+                     'logs': SIMPDataset._get_storable_logs(getattr(solutions[-1], 'logs', None))}
+        path = os.path.join(root, SIMPDataset._get_shard_file_name(i_problem))
+        torch.save(shard, f'{path}.tmp')
+        os.replace(f'{path}.tmp', path)
+        return i_problem, len(solutions)
+
+
+    def _get_manifest_header(self):
+        simp_config = json.dumps(self.simp._get_cache_config(), sort_keys=True, default=str)
+        return {
+            'n_problems': len(self.problems),
+            'problem_fingerprints': [problem.get_fingerprint() for problem in self.problems],
+            'simp_config': hashlib.sha256(simp_config.encode()).hexdigest()
+        }
+
+
+    def _load_manifest(self):
+        header = self._get_manifest_header()
+        if not os.path.isfile(self.manifest_path):
+            if os.path.isfile(self.completion_log_path):
+                os.remove(self.completion_log_path)
+            with open(f'{self.manifest_path}.tmp', 'w') as file:
+                json.dump(header, file, indent=1)
+            os.replace(f'{self.manifest_path}.tmp', self.manifest_path)
+            return {**header, 'shards': {}}
+
+        with open(self.manifest_path) as file:
+            manifest = json.load(file)
+        if manifest.get('n_problems') != len(self.problems):
+            raise ValueError(f"SIMPDataset: The manifest in {self.root} belongs to {manifest.get('n_problems')} problems, but {len(self.problems)} problems were given.")
+        if manifest.get('problem_fingerprints') != header['problem_fingerprints']:
+            raise ValueError(f"SIMPDataset: The problems of the manifest in {self.root} do not match the given problems.")
+        if manifest.get('simp_config') != header['simp_config']:
+            raise ValueError(f"SIMPDataset: The shards in {self.root} were generated with a different SIMP configuration.")
+        manifest['shards'] = self._read_completion_log()
+        return manifest
+
+
+    def _read_completion_log(self):
+        shards = {}
+        if not os.path.isfile(self.completion_log_path):
+            return shards
+        with open(self.completion_log_path) as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue # A record that was only partially written before the generation was interrupted.
+                shards[str(record['problem'])] = {'file': record['file'], 'n_solutions': record['n_solutions']}
+        return shards
+
+
+    def _open_completion_log(self):
+        needs_newline = False
+        if os.path.isfile(self.completion_log_path) and os.path.getsize(self.completion_log_path) > 0:
+            with open(self.completion_log_path, 'rb') as file:
+                file.seek(-1, os.SEEK_END)
+                needs_newline = file.read(1) != b'\n'
+        log = open(self.completion_log_path, 'a')
+        if needs_newline:
+            log.write('\n')
+        return log
+
+
+    def _write_pending_shards(self, pending_problem_indices):
+        if self.n_workers == 0:
+            for i_problem in pending_problem_indices:
+                yield SIMPDataset._write_shard(self.simp, self.root, i_problem, self.problems[i_problem])
+            return
+
+        with ProcessPoolExecutor(max_workers=self.n_workers,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_simp_dataset_worker,
+                                 initargs=(self.simp, self.root)) as executor:
+            futures = [executor.submit(_write_shard_in_worker, i_problem, self.problems[i_problem]) for i_problem in pending_problem_indices]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+    def _generate_shards(self, verbose):
+        os.makedirs(self.root, exist_ok=True)
+        manifest = self._load_manifest()
+        pending_problem_indices = [i for i in range(len(self.problems)) if str(i) not in manifest['shards']]
+        completed_shards = self._write_pending_shards(pending_problem_indices)
+        if verbose:
+            completed_shards = tqdm(completed_shards, total=len(pending_problem_indices))
+
+        with self._open_completion_log() as log:
+            for i_problem, n_solutions in completed_shards:
+                shard = {'file': self._get_shard_file_name(i_problem), 'n_solutions': n_solutions}
+                log.write(json.dumps({'problem': i_problem, **shard}) + '\n')
+                log.flush()
+                manifest['shards'][str(i_problem)] = shard
+        return manifest
+
+
+    def _index_samples(self, samples):
+        self.list_of_problems_and_orig_solution_indices = defaultdict(list)
+        for i, (i_problem, i_solution) in enumerate(samples.index):
+            if i_solution >= 0:
+                self.list_of_problems_and_orig_solution_indices[i_problem].append(i)
+        return samples
+
+
+    def _open_shards(self, manifest):
+        return self._index_samples(ShardedSIMPSamples(self.root, self.problems, manifest, self.n_cached_shards))
+
+
+    def _get_orig_θ(self, i_problem, i_solution):
+        if isinstance(self.dataset, SIMPSamples):
+            return self.dataset._get_θ(i_problem, i_solution)
+        return self.dataset[self.list_of_problems_and_orig_solution_indices[i_problem][i_solution]][1].θ
+
+
+    def augment(self,
+                pde_solver:"dl4to.pde.PDESolver", # The PDE solver with which SIMP is run again on each problem.
+                max_augmentation_per_problem:int=5, # The maximal number of solutions that are added per problem.
+                threshold:float=1e-3 # The mean absolute density deviation on the design space above which a solution is added.
+               ):
+        """
+        Runs SIMP again on each problem with `pde_solver` and adds the first solutions whose densities deviate from the stored SIMP solutions by more than `threshold`.
+        The problems are processed one after another, such that only the shard of the current problem is read if the dataset was opened from shards. The added samples are kept in memory.
+        """
         problems_ = deepcopy(self.problems)
         for i_problem, problem in enumerate(problems_):
             old_pde_solver = self.problems[i_problem].pde_solver
@@ -950,12 +1142,14 @@ class SIMPDataset(TopoDataset):
             simp_deviations = []
             first_error = 0
             solutions = self.simp(problems_or_solutions=problem)
+            n_orig_solutions = len(self.list_of_problems_and_orig_solution_indices[i_problem])
             solutions_to_add_to_dataset = []
-            for i_solution, solution in enumerate(solutions):
+            for i_solution in range(min(len(solutions), n_orig_solutions)):
                 if augmentation_counter < max_augmentation_per_problem:
+                    solution = solutions[i_solution]
                     solution._θ = solution._θ.detach()
-                    orig_simp_solution = self.dataset[self.list_of_problems_and_orig_solution_indices[i_problem][i_solution]][1]
-                    simp_deviation = (solution._θ[problem.Ω_design==-1] - orig_simp_solution._θ[problem.Ω_design==-1]).abs().mean()
+                    orig_simp_θ = self._get_orig_θ(i_problem, i_solution)
+                    simp_deviation = (solution._θ[problem.Ω_design==-1] - orig_simp_θ[problem.Ω_design==-1]).abs().mean()
                     simp_deviations.append(simp_deviation.item())
                     if simp_deviation > threshold:
                         if augmentation_counter == 0:
@@ -975,4 +1169,135 @@ class SIMPDataset(TopoDataset):
             self._size += augmentation_counter
             print(f"Problem {i_problem}: {simp_correct_counter} correct SIMP iterations (next iteration had an error of {first_error:.3f}).")
             print(simp_deviations)
-            print(f"Augmented dataset by {augmentation_counter} samples.")
\ No newline at end of file
+            print(f"Augmented dataset by {augmentation_counter} samples.")
+
+# Internal Cell
+class SIMPSamples(Sequence):
+    """
+    A lazy sequence of `(problem, solution)` samples of SIMP trajectories, where the solutions are only created when they are accessed.
+    For each problem, the trivial solutions with densities 0 and 0.5 are followed by the intermediate SIMP solutions, which carry the final logs of the SIMP run of their problem. Samples that are appended later are kept in memory.
+    """
+    def __init__(self, problems, n_solutions_per_problem):
+        self.problems = problems
+        self.index = []
+        for i_problem, n_solutions in enumerate(n_solutions_per_problem):
+            self.index += [(i_problem, -2), (i_problem, -1)] + [(i_problem, i_solution) for i_solution in range(n_solutions)]
+        self.appended_samples = []
+
+
+    def __len__(self):
+        return len(self.index) + len(self.appended_samples)
+
+
+    def _get_θ(self, i_problem, i_solution):
+        raise NotImplementedError("Must be overridden.")
+
+
+    def _get_logs(self, i_problem):
+        raise NotImplementedError("Must be overridden.")
+
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Could not find dataset entry with index {idx}.")
+        if idx >= len(self.index):
+            return self.appended_samples[idx - len(self.index)]
+
+        i_problem, i_solution = self.index[idx]
+        problem = self.problems[i_problem]
+        if i_solution == -2:
+            return problem, 0. * problem.trivial_solution
+        if i_solution == -1:
+            return problem, 0.5 * problem.trivial_solution
+        θ = self._get_θ(i_problem, i_solution)
+        solution = Solution(problem=problem, θ=θ.type(problem.dtype))
+        solution.logs = self._get_logs(i_problem)
+        return problem, solution
+
+
+    def append(self, sample):
+        self.appended_samples.append(sample)
+
+
+    def __iadd__(self, samples):
+        self.appended_samples.extend(samples)
+        return self
+
+
+class TrajectorySIMPSamples(SIMPSamples):
+    """
+    Lazy samples whose densities are reconstructed from in-memory `SIMPTrajectory` objects.
+    """
+    def __init__(self, problems, trajectories):
+        super().__init__(problems, [len(trajectory) for trajectory in trajectories])
+        self.trajectories = trajectories
+
+
+    def _get_θ(self, i_problem, i_solution):
+        return self.trajectories[i_problem].get_θ(i_solution)
+
+
+    def _get_logs(self, i_problem):
+        return self.trajectories[i_problem].logs
+
+
+class ShardedSIMPSamples(SIMPSamples):
+    """
+    Lazy samples whose densities are loaded from the shard files listed in a manifest. The `n_cached_shards` most recently used shards are cached.
+    """
+    def __init__(self, root, problems, manifest, n_cached_shards=16):
+        n_solutions_per_problem = [manifest['shards'][str(i_problem)]['n_solutions'] for i_problem in range(len(problems))]
+        super().__init__(problems, n_solutions_per_problem)
+        self.root = root
+        self.manifest = manifest
+        self.n_cached_shards = n_cached_shards
+        self._cached_shards = OrderedDict()
+
+
+    def _load_shard(self, i_problem):
+        if i_problem in self._cached_shards:
+            self._cached_shards.move_to_end(i_problem)
+            return self._cached_shards[i_problem]
+        path = os.path.join(self.root, self.manifest['shards'][str(i_problem)]['file'])
+        shard = torch.load(path)
+        if not isinstance(shard, dict):
+            shard = {'θ': shard, 'logs': None}
+        elif 'θ' not in shard:
+            logs = shard.get('logs')
+            shard = SIMPTrajectory.from_state_dict(shard, problem=self.problems[i_problem])
+            shard.logs = logs
+        self._cached_shards[i_problem] = shard
+        while len(self._cached_shards) > max(1, self.n_cached_shards):
+            self._cached_shards.popitem(last=False)
+        return shard
+
+
+    def _get_θ(self, i_problem, i_solution):
+        shard = self._load_shard(i_problem)
+        if isinstance(shard, SIMPTrajectory):
+            return shard.get_θ(i_solution)
+        return shard['θ'][i_solution]
+
+
+    def _get_logs(self, i_problem):
+        shard = self._load_shard(i_problem)
+        if isinstance(shard, SIMPTrajectory):
+            return shard.logs
+        return shard['logs']
+
+# Internal Cell
+_simp_dataset_worker_state = {}
+
+
+def _init_simp_dataset_worker(simp, root):
+    torch.set_num_threads(1)
+    _simp_dataset_worker_state['simp'] = simp
+    _simp_dataset_worker_state['root'] = root
+
+
+def _write_shard_in_worker(i_problem, problem):
+    return SIMPDataset._write_shard(_simp_dataset_worker_state['simp'], _simp_dataset_worker_state['root'], i_problem, problem)
\ No newline at end of file
@@ -1,6 +1,7 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: notebooks/density_representers/3_deep_image_prior_density_representer.ipynb (unless otherwise specified).
 
-__all__ = ['DensityRepresenter', 'FilteringDensityRepresenter', 'filter_fcts', 'DeepImagePriorDensityRepresenter']
+__all__ = ['DensityRepresenter', 'FilteringDensityRepresenter', 'filter_fcts', 'BatchedFilteringDensityRepresenter',
+           'DeepImagePriorDensityRepresenter']
 
 # Internal Cell
 import math
@@ -40,18 +41,40 @@ class DensityRepresenter(torch.nn.Module):
             self.reset_binarizer()
 
 
+    @property
+    def Ω_design(self):
+        return self.problem.Ω_design
+
+
+    def _get_Ω_design_masks(self):
+        Ω_design = self.Ω_design
+        if getattr(self, '_Ω_design_masks_source', None) is not Ω_design or self._Ω_design_masks_version != Ω_design._version:
+            self._Ω_design_masks = (Ω_design == 0, Ω_design == 1)
+            self._Ω_design_masks_source = Ω_design
+            self._Ω_design_masks_version = Ω_design._version
+        return self._Ω_design_masks
+
+
     def _apply_density_representer(self):
         raise NotImplementedError("Must be overridden.")
 
 
-    def _apply_binarizer(self, θ):
+    def _apply_binarizer(self, θ, binarizer_strength=None):
         η = .5
-        β = self.binarizer_strength
+        β = self.binarizer_strength if binarizer_strength is None else binarizer_strength
         numerator = math.tanh(β * η) + torch.tanh(β * (θ - η))
         divisor   = math.tanh(β * η) +  math.tanh(β * (1 - η))
         return numerator / divisor
 
 
+    def _invert_binarizer(self, θ):
+        η = .5
+        β = self.binarizer_strength
+        divisor = math.tanh(β * η) + math.tanh(β * (1 - η))
+        tanh_value = (θ * divisor - math.tanh(β * η)).clamp(-1 + 1e-6, 1 - 1e-6)
+        return (η + torch.atanh(tanh_value) / β).clamp(0, 1)
+
+
     def steepen_binarizer(self,
                           binarizer_steepening_factor:float=1.1 # The factor by which to change the current binarizer strength. A value of 1. means that the binarizer does not change.
                          ):
@@ -74,13 +97,17 @@ class DensityRepresenter(torch.nn.Module):
         The projection step makes sure that the problem conditions are fulfilled and that the density has no values outside of the unit interval.
         Returns a flattened `torch.Tensor` containing the density distribution.
         """
-        θ = self._apply_density_representer()
+        return self._apply_binarizer_and_projection(self._apply_density_representer())
+
+
+    def _apply_binarizer_and_projection(self, θ, binarizer_strength=None, Ω_design_masks=None):
         if not (torch.all(0 <= θ) and torch.all(θ <= 1)):
             raise ValueError("The function DensityRepresenter_density_representer is only allowed to produce values in [0, 1].")
 
-        θ = self._apply_binarizer(θ)
-        θ[self.problem.Ω_design == 0] = 0.
-        θ[self.problem.Ω_design == 1] = 1.
+        θ = self._apply_binarizer(θ, binarizer_strength)
+        void_mask, solid_mask = self._get_Ω_design_masks() if Ω_design_masks is None else Ω_design_masks
+        θ[void_mask] = 0.
+        θ[solid_mask] = 1.
 
         return θ.clamp(0, 1)
 
@@ -88,12 +115,12 @@ class DensityRepresenter(torch.nn.Module):
 import torch
 
 from .density_representers import DensityRepresenter
-from .density_filters import UniformDensityFilter, RadialDensityFilter, MaxPoolDensityFilter
+from .density_filters import UniformDensityFilter, RadialDensityFilter, MaxPoolDensityFilter, HelmholtzDensityFilter
 import warnings
 
 # Cell
 
-filter_fcts = ['radial', 'uniform', 'max_pool', None]
+filter_fcts = ['radial', 'uniform', 'max_pool', 'helmholtz', None]
 
 class FilteringDensityRepresenter(DensityRepresenter):
     """
@@ -102,7 +129,7 @@ class FilteringDensityRepresenter(DensityRepresenter):
     def __init__(self,
                  problem:"dl4to.problem.Problem"=None, # The problem object for which the density representer is used. The problem object is necessary to grant that boundary and design space constraints are fulfilled. However, the problem does not need to be passed during initializiaton but can also be passed later by overriding `density_representer.problem`.
                  filter_size:int=3, # The size of the filter kernel.
-                 filter_fct:str='radial', # The type of filtering strategy that is used. Possible options are "radial", "uniform", "max_pool" and None.
+                 filter_fct:str='radial', # The type of filtering strategy that is used. Possible options are "radial", "uniform", "max_pool", "helmholtz" and None.
                  binarizer_strength:float=1., #  The steepness of the smoothed Heaviside-function. A binarizer strength of infinity would corresponds to a non-smooth classical Heaviside step function.
                  θ_default:float=.5 # The weighting factor for the trivial solution density that is used as the initialization of the latent density distribution.
                 ):
@@ -123,6 +150,8 @@ class FilteringDensityRepresenter(DensityRepresenter):
             self.filter = UniformDensityFilter(filter_size=self.filter_size, dtype=self.problem.dtype)
         elif self.filter_fct == 'max_pool':
             self.filter = MaxPoolDensityFilter(filter_size=self.filter_size, dtype=self.problem.dtype)
+        elif self.filter_fct == 'helmholtz':
+            self.filter = HelmholtzDensityFilter(filter_size=self.filter_size, dtype=self.problem.dtype)
         else:
             self.filter = lambda θ: θ
 
@@ -133,19 +162,110 @@ class FilteringDensityRepresenter(DensityRepresenter):
         self._setup_filter()
 
 
+    def set_latent_θ(self,
+                     θ:torch.Tensor # The latent density distribution of shape (1, x, y, z). If its shape deviates from the shape of the current problem, it is trilinearly interpolated.
+                    ):
+        """
+        Overrides the latent density distribution, e.g., with a density that was optimized for a coarser version of the problem.
+        """
+        θ = θ.detach().to(self.θ.device).type(self.θ.dtype)
+        if tuple(θ.shape[-3:]) != tuple(self.problem.shape):
+            θ = torch.nn.functional.interpolate(θ.unsqueeze(0), size=tuple(self.problem.shape), mode='trilinear', align_corners=False).squeeze(0)
+        self.θ.data = θ.clamp(0, 1)
+
+
+    def set_density(self,
+                    θ:torch.Tensor, # The density distribution that the density representer should return, e.g., the prediction of a trained topo solver. Its shape is the same as that of the latent density distribution. Deviating spatial shapes are trilinearly interpolated.
+                    n_iterations:int=50 # The number of projected Landweber iterations that are used to invert the density filter.
+                   ):
+        """
+        Sets the latent density distribution such that the density representer approximately returns the density distribution `θ`.
+        The binarizer is inverted analytically, and the density filter is inverted by a least-squares fit of the latent density on the design space.
+        """
+        self.set_latent_θ(self._invert_binarizer(θ.detach().to(self.θ.device).type(self.θ.dtype)))
+        θ_target = self.θ.data.clone()
+        void_mask, solid_mask = self._get_Ω_design_masks()
+        free_mask = ~(void_mask | solid_mask)
+
+        θ_latent = θ_target.clone()
+        for _ in range(n_iterations):
+            θ_latent[void_mask], θ_latent[solid_mask] = 0., 1.
+            θ_latent.requires_grad_(True)
+            residual = (self._apply_filter(θ_latent) - θ_target) * free_mask
+            gradient, = torch.autograd.grad(.5 * (residual ** 2).sum(), θ_latent)
+            θ_latent = (θ_latent.detach() - gradient).clamp(0, 1)
+        self.θ.data = θ_latent
+
+
+    def _apply_filter(self, θ):
+        return self.filter(θ.unsqueeze(0)).squeeze(0)
+
+
     def _apply_density_representer(self):
         self.θ.data.clamp_(0, 1)
 
-        self.θ.data[self.problem.Ω_design == 0] = 0.
-        self.θ.data[self.problem.Ω_design == 1] = 1.
+        void_mask, solid_mask = self._get_Ω_design_masks()
+        self.θ.data[void_mask] = 0.
+        self.θ.data[solid_mask] = 1.
 
-        θ = self.filter(self.θ.unsqueeze(0)).squeeze(0)
+        θ = self._apply_filter(self.θ)
 
         if θ.max().item() > 1.1 or θ.min().item() < -0.1:
             warnings.warn("Density value is too large or too small")
 
         return θ.clamp(0, 1)
 
+# Cell
+class BatchedFilteringDensityRepresenter(FilteringDensityRepresenter):
+    """
+    A filtering density representer for a batch of problems with the same shape. The latent density distributions of all problems are stacked into a single tensor of shape (B, 1, X, Y, Z),
+    such that the whole batch is filtered with a single convolution. Calling the density representer returns the stacked densities of all problems.
+    """
+    def __init__(self,
+                 problems:list=None, # The problems for which the density representer is used. All problems need to have the same shape. The problems can also be passed later by overriding `density_representer.problems`.
+                 filter_size:int=3, # The size of the filter kernel.
+                 filter_fct:str='radial', # The type of filtering strategy that is used. Possible options are "radial", "uniform", "max_pool", "helmholtz" and None.
+                 binarizer_strength:float=1., #  The steepness of the smoothed Heaviside-function. A binarizer strength of infinity would corresponds to a non-smooth classical Heaviside step function.
+                 θ_default:float=.5 # The weighting factor for the trivial solution density that is used as the initialization of the latent density distributions.
+                ):
+        super().__init__(
+            filter_size=filter_size,
+            filter_fct=filter_fct,
+            binarizer_strength=binarizer_strength,
+            θ_default=θ_default
+        )
+        self.problems = problems
+
+
+    @property
+    def problems(self):
+        return self._problems
+
+
+    @problems.setter
+    def problems(self, problems):
+        self._problems = problems
+        if problems is not None:
+            if len({tuple(problem.shape) for problem in problems}) != 1:
+                raise ValueError("BatchedFilteringDensityRepresenter: All problems need to have the same shape.")
+            self.problem = problems[0]
+
+
+    @property
+    def Ω_design(self):
+        return self._Ω_design
+
+
+    def _setup_for_problem(self):
+        self._Ω_design = torch.stack([problem.Ω_design for problem in self.problems])
+        θ = torch.ones(len(self.problems), 1, *self.problem.shape, dtype=self.problem.dtype) * self.θ_default
+        self.θ = torch.nn.Parameter(θ, requires_grad=True)
+        self._setup_filter()
+
+
+    def _apply_filter(self, θ):
+        return self.filter(θ)
+
 # Internal Cell
 import torch
 
@@ -1,7 +1,7 @@
-# AUTOGENERATED! DO NOT EDIT! File to edit: notebooks/pde/5_fdm_solver.ipynb (unless otherwise specified).
+# AUTOGENERATED! DO NOT EDIT! File to edit: notebooks/pde/6_reduced_order_pde_solver.ipynb (unless otherwise specified).
 
-__all__ = ['AutogradLinearSolver', 'LinearSolver', 'SparseLinearSolver', 'PDESolver', 'FDMDerivatives',
-           'FDMAdjointDerivatives', 'FDMAssembly', 'UnpaddedFDM', 'FDM']
+__all__ = ['AutogradLinearSolver', 'LinearSolver', 'SparseLinearSolver', 'DomainDecompositionLinearSolver', 'PDESolver',
+           'FDMDerivatives', 'FDMAdjointDerivatives', 'FDMAssembly', 'UnpaddedFDM', 'FDM', 'ReducedOrderPDESolver']
 
 # Cell
 import torch
@@ -9,8 +9,13 @@ import numpy as np
 import time
 import importlib.util
 import warnings
-from scipy.sparse.linalg import factorized, use_solver, spsolve
-from scipy.sparse import csc_matrix
+import os
+import atexit
+import itertools
+import threading
+import multiprocessing
+from scipy.sparse.linalg import factorized, use_solver, spsolve, splu
+from scipy.sparse import csc_matrix, csr_matrix
 from typing import Callable
 
 use_solver(assumeSortedIndices=True)
@@ -123,6 +128,339 @@ class SparseLinearSolver(LinearSolver):
     def _solver(self):
         return lambda A, b: spsolve(A, b, use_umfpack=self.use_umfpack)
 
+# Internal Cell
+def _run_subdomain_command(subdomains, command, k, payload):
+    if command == 'factorize':
+        A_II, A_IΓ, A_ΓI = payload
+        subdomains[k] = (splu(A_II), A_IΓ, A_ΓI)
+        return None
+    if command == 'release':
+        for key in [key for key in subdomains if key[0] == k]:
+            del subdomains[key]
+        return None
+
+    lu, A_IΓ, A_ΓI = subdomains[k]
+    if command == 'condense':
+        b_I = payload
+        return A_ΓI @ lu.solve(b_I)
+    if command == 'schur_matvec':
+        u_Γ = payload
+        return A_ΓI @ lu.solve(A_IΓ @ u_Γ)
+    if command == 'expand':
+        b_I, u_Γ = payload
+        return lu.solve(b_I - A_IΓ @ u_Γ)
+    raise ValueError(f"Unknown subdomain command {command}.")
+
+
+def _subdomain_worker(connection):
+    subdomains = {}
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if message is None:
+            break
+        connection.send(_run_subdomain_command(subdomains, *message))
+    connection.close()
+
+# Internal Cell
+class SubdomainWorkers:
+    """
+    A pool of worker processes, each of which keeps the factorizations of the subdomains that are assigned to it.
+    The factorizations are stored per solver token, so that all solvers of a process can share one pool via `SubdomainWorkers.get_shared`.
+    If `n_workers=0`, then all subdomains are handled in the main process.
+    """
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, n_workers):
+        self.n_workers = n_workers
+        self._subdomains = {}
+        self._processes = []
+        self._connections = []
+        self._lock = threading.Lock()
+        self._released_tokens = []
+        context = multiprocessing.get_context('spawn')
+        for _ in range(n_workers):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_subdomain_worker, args=(worker_connection,), daemon=True)
+            process.start()
+            worker_connection.close()
+            self._processes.append(process)
+            self._connections.append(connection)
+
+
+    @classmethod
+    def get_shared(cls, n_workers):
+        """
+        Returns the pool with `n_workers` workers that is shared by all solvers of this process and starts it if necessary.
+
+        Returns
+        -------
+        SubdomainWorkers
+        """
+        with cls._shared_lock:
+            workers = cls._shared.get(n_workers)
+            if workers is None or not workers.is_alive():
+                workers = cls._shared[n_workers] = cls(n_workers)
+            return workers
+
+
+    @classmethod
+    def close_shared(cls):
+        """
+        Shuts down all shared pools.
+        """
+        with cls._shared_lock:
+            for workers in cls._shared.values():
+                workers.close()
+            cls._shared = {}
+
+
+    def is_alive(self):
+        """
+        Whether all worker processes are still running.
+
+        Returns
+        -------
+        bool
+        """
+        return len(self._connections) == self.n_workers and all(process.is_alive() for process in self._processes)
+
+
+    def map(self, command, payloads, token):
+        """
+        Runs `command` for all subdomains of the solver with the given `token`. Subdomain `k` is always handled by the same worker, so that its factorization can be reused.
+
+        Returns
+        -------
+        list
+        """
+        results = []
+        with self._lock:
+            self._release_tokens()
+            if self.n_workers == 0:
+                return [_run_subdomain_command(self._subdomains, command, (token, k), payload) for k, payload in enumerate(payloads)]
+            for start in range(0, len(payloads), self.n_workers):
+                batch = payloads[start:start+self.n_workers]
+                for w, payload in enumerate(batch):
+                    self._connections[w].send((command, (token, start + w), payload))
+                for w in range(len(batch)):
+                    results.append(self._connections[w].recv())
+        return results
+
+
+    def release(self, token):
+        """
+        Releases all subdomain factorizations of the solver with the given `token`.
+        If the pool is busy, e.g. because a solver is garbage collected during a command, then the factorizations are released before the next command.
+        """
+        self._released_tokens.append(token)
+        if self._lock.acquire(blocking=False):
+            try:
+                self._release_tokens()
+            finally:
+                self._lock.release()
+
+
+    def _release_tokens(self):
+        while self._released_tokens:
+            token = self._released_tokens.pop()
+            if self.n_workers == 0:
+                _run_subdomain_command(self._subdomains, 'release', token, None)
+                continue
+            for connection in self._connections:
+                connection.send(('release', token, None))
+            for connection in self._connections:
+                connection.recv()
+
+
+    def close(self):
+        """
+        Shuts down all worker processes.
+        """
+        for connection in self._connections:
+            try:
+                connection.send(None)
+                connection.close()
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=1)
+        self._processes = []
+        self._connections = []
+        self._subdomains = {}
+
+
+    def __del__(self):
+        self.close()
+
+
+atexit.register(SubdomainWorkers.close_shared)
+
+# Cell
+class DomainDecompositionLinearSolver(LinearSolver):
+    """
+    A linear solver that splits the voxel grid into slabs along its longest axis and solves the system with a Schur complement method.
+    Neighboring slabs are separated by the unknowns of the upper slab that couple to the lower one, and the interior unknowns of every slab are factorized in parallel worker processes.
+    The Schur complement system on the separators is never assembled. Instead, it is solved with the conjugate gradient method, where the workers apply their local Schur complements and the factorized separator block serves as preconditioner.
+    The decomposition is kept until a new system matrix is passed, so that the adjoint solve of the backward pass is distributed over the same workers.
+    All solvers with the same number of workers share one pool of worker processes, so cloning the solver for every problem does not start new processes.
+    """
+    _tokens = itertools.count()
+
+    def __init__(self,
+                 n_subdomains:int=4, # The number of slabs that the voxel grid is split into.
+                 n_workers:int=None, # The number of worker processes. Defaults to one worker per subdomain, but at most `os.cpu_count()`. If `n_workers=0`, then all subdomains are factorized in the main process.
+                 rtol:float=1e-10, # The relative residual tolerance of the conjugate gradient method on the separators.
+                 max_iterations:int=1000 # The maximum number of conjugate gradient iterations on the separators.
+                ):
+        super().__init__(factorize=False)
+        self.n_subdomains = n_subdomains
+        self.n_workers = min(n_subdomains, os.cpu_count()) if n_workers is None else n_workers
+        self.rtol = rtol
+        self.max_iterations = max_iterations
+        self._workers = None
+        self._token = None
+        self._A_mat = None
+        self._shape = None
+
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_workers'] = None
+        state['_token'] = None
+        state['_A_mat'] = None
+        state['_ΓΓ_lu'] = None
+        return state
+
+
+    def _get_slab_indices(self, shape):
+        axis = int(np.argmax(shape))
+        n_subdomains = max(1, min(self.n_subdomains, shape[axis]))
+        coordinates = np.arange(shape[axis]).reshape([-1 if i == axis else 1 for i in range(3)])
+        slabs = np.broadcast_to(coordinates * n_subdomains // shape[axis], shape).flatten()
+        return np.tile(slabs, 3), n_subdomains
+
+
+    def _decompose(self, A_mat):
+        A = csr_matrix(A_mat)
+        if self._shape is None or A.shape[0] != 3 * np.prod(self._shape):
+            raise ValueError("The system matrix does not fit to the shape of the density.")
+        slabs, n_subdomains = self._get_slab_indices(self._shape)
+
+        A_coo = A.tocoo()
+        cut = slabs[A_coo.row] < slabs[A_coo.col]
+        is_interface = np.zeros(A.shape[0], dtype=bool)
+        is_interface[A_coo.col[cut]] = True
+        self._Γ = np.flatnonzero(is_interface)
+        A_Γ_rows = A[self._Γ]
+        self._A_ΓΓ = A_Γ_rows[:, self._Γ].tocsr()
+        self._ΓΓ_lu = splu(self._A_ΓΓ.tocsc()) if len(self._Γ) > 0 else None
+
+        self._interiors, self._local_Γs, payloads = [], [], []
+        for k in range(n_subdomains):
+            interior = np.flatnonzero((slabs == k) & ~is_interface)
+            if len(interior) == 0:
+                continue
+            A_I_rows = A[interior]
+            A_IΓ = A_I_rows[:, self._Γ].tocsc()
+            A_ΓI = A_Γ_rows[:, interior].tocsr()
+            local_Γ = np.union1d(np.flatnonzero(np.diff(A_IΓ.indptr)), np.flatnonzero(np.diff(A_ΓI.indptr)))
+            self._interiors.append(interior)
+            self._local_Γs.append(local_Γ)
+            payloads.append((A_I_rows[:, interior].tocsc(), A_IΓ[:, local_Γ].tocsr(), A_ΓI[local_Γ]))
+
+        self.close()
+        self._workers = SubdomainWorkers.get_shared(self.n_workers)
+        self._token = next(self._tokens)
+        self._workers.map('factorize', payloads, self._token)
+        self._A_mat = A_mat
+
+
+    def _subtract_local_contributions(self, v_Γ, command, payloads):
+        for local_Γ, g in zip(self._local_Γs, self._workers.map(command, payloads, self._token)):
+            v_Γ[local_Γ] -= g
+        return v_Γ
+
+
+    def _apply_schur_complement(self, u_Γ):
+        return self._subtract_local_contributions(self._A_ΓΓ @ u_Γ, 'schur_matvec', [u_Γ[local_Γ] for local_Γ in self._local_Γs])
+
+
+    def _solve_interface(self, rhs_Γ):
+        u_Γ = np.zeros_like(rhs_Γ)
+        r = rhs_Γ.copy()
+        z = self._ΓΓ_lu.solve(r)
+        p = z.copy()
+        rz = r @ z
+        tol = self.rtol * np.linalg.norm(rhs_Γ)
+        for _ in range(self.max_iterations):
+            if np.linalg.norm(r) <= tol:
+                return u_Γ
+            Sp = self._apply_schur_complement(p)
+            α = rz / (p @ Sp)
+            u_Γ += α * p
+            r -= α * Sp
+            z = self._ΓΓ_lu.solve(r)
+            rz, rz_old = r @ z, rz
+            p = z + (rz / rz_old) * p
+        if np.linalg.norm(r) > tol:
+            warnings.warn(f"DomainDecompositionLinearSolver: The conjugate gradient method on the separators did not converge within {self.max_iterations} iterations.")
+        return u_Γ
+
+
+    def _solve(self, A_mat, b):
+        if A_mat is not self._A_mat:
+            self._decompose(A_mat)
+        b = np.asarray(b, dtype=np.float64)
+
+        rhs_Γ = self._subtract_local_contributions(b[self._Γ].copy(), 'condense', [b[interior] for interior in self._interiors])
+        u_Γ = self._solve_interface(rhs_Γ) if len(self._Γ) > 0 else rhs_Γ
+
+        x = np.empty_like(b)
+        x[self._Γ] = u_Γ
+        payloads = [(b[interior], u_Γ[local_Γ]) for interior, local_Γ in zip(self._interiors, self._local_Γs)]
+        for interior, u_I in zip(self._interiors, self._workers.map('expand', payloads, self._token)):
+            x[interior] = u_I
+        return x
+
+
+    def _solver(self):
+        return self._solve
+
+
+    def __call__(self,
+                 θ:torch.Tensor, # The density for which the PDE is solved.
+                 A_op:Callable[[torch.Tensor, torch.Tensor], torch.Tensor], # A function that takes `u` and `θ` as input and outputs the right hand side of the PDE. In other words, this is an operator representing the system matrix.
+                 b:torch.Tensor, # A flattened version of the right side of the PDE.
+                 A_mat:csc_matrix # The system matrix in sparse format.
+                ):
+        """
+        Solves the PDE for the density `θ`. Returns the solution as a `torch.Tensor` object.
+        """
+        self._shape = tuple(θ.shape[-3:])
+        return super().__call__(θ, A_op, b, A_mat)
+
+
+    def close(self):
+        """
+        Releases the subdomain factorizations of this solver in the shared worker processes.
+        """
+        if self._workers is not None and self._token is not None:
+            self._workers.release(self._token)
+        self._workers = None
+        self._token = None
+        self._A_mat = None
+
+
+    def __del__(self):
+        try:
+            self.close()
+        except (BrokenPipeError, OSError, EOFError):
+            pass
+
 # Internal Cell
 import copy
 import torch
@@ -563,9 +901,12 @@ class UnpaddedFDM(PDESolver):
     def __init__(self, θ_min:float=1e-6, # The minimal value in the stiffness matrix. For numerical reasons we can not allow 0s, since they may lead to singular matrices.
                  use_forward_differences:bool=True, # Whether to use forward differences or central differences.
                  assemble_tensors_when_passed_to_problem:bool=True, # Whether the PDE solver methods pre-assembles any tensors or arrays before solving the PDE for a concrete problem.
+                 linear_solver:"dl4to.pde.LinearSolver"=None # The linear solver that is used to solve the assembled system. If None, then a factorizing `SparseLinearSolver` is used.
                  ):
         self._θ_min = θ_min
-        self._linear_solver = SparseLinearSolver(use_umfpack=True, factorize=True)
+        if linear_solver is None:
+            linear_solver = SparseLinearSolver(use_umfpack=True, factorize=True)
+        self._linear_solver = linear_solver
         self.use_forward_differences = use_forward_differences
         self.assemble_tensors_when_passed_to_problem = assemble_tensors_when_passed_to_problem
         self.assembled_tensors = False
@@ -824,13 +1165,15 @@ class FDM(UnpaddedFDM):
     def __init__(self, θ_min:float=1e-6, # The minimal value in the stiffness matrix. For numerical reasons we can not allow 0s, since they may lead to singular matrices.
                  use_forward_differences:bool=True, # Whether to use forward differences or central differences.
                  assemble_tensors_when_passed_to_problem:bool=True, # Whether the PDE solver methods pre-assembles any tensors or arrays before solving the PDE for a concrete problem.
-                 padding_depth:int=0 # The depth of the padding surrounding the design space. In some cases, it is recommended to increase the padding depth to 2 to improve results but also increase running time.
+                 padding_depth:int=0, # The depth of the padding surrounding the design space. In some cases, it is recommended to increase the padding depth to 2 to improve results but also increase running time.
+                 linear_solver:"dl4to.pde.LinearSolver"=None # The linear solver that is used to solve the assembled system. If None, then a factorizing `SparseLinearSolver` is used.
                 ):
         self.padding_depth = padding_depth
         super().__init__(
             θ_min=θ_min,
             use_forward_differences=use_forward_differences,
-            assemble_tensors_when_passed_to_problem=assemble_tensors_when_passed_to_problem
+            assemble_tensors_when_passed_to_problem=assemble_tensors_when_passed_to_problem,
+            linear_solver=linear_solver
         )
 
 
@@ -927,4 +1270,138 @@ class FDM(UnpaddedFDM):
         σ_vm = get_σ_vm(σ)
         if get_padded:
             return u, σ, σ_vm
-        return self._remove_padding(u), self._remove_padding(σ), self._remove_padding(σ_vm)
\ No newline at end of file
+        return self._remove_padding(u), self._remove_padding(σ), self._remove_padding(σ_vm)
+
+# Internal Cell
+import torch
+import numpy as np
+
+from .pde import PDESolver, AutogradLinearSolver
+
+# Cell
+class ReducedOrderPDESolver(PDESolver):
+    """
+    A PDE solver that wraps an FDM solver and answers repeated solves for the same problem with a reduced-order model.
+    The displacements of full solves are collected as snapshots and compressed into a proper orthogonal decomposition (POD) basis.
+    Subsequent solves are answered by a Galerkin projection of the system onto that basis. If the relative residual of the reduced solution exceeds `tol`, then the wrapped solver is called instead and its solution is added to the snapshots.
+    Gradients of reduced solutions are computed with the projected adjoint system, so that the solver can be used in SIMP.
+    """
+    def __init__(self,
+                 pde_solver:"dl4to.pde.UnpaddedFDM", # The full PDE solver that is wrapped, e.g. `dl4to.pde.FDM`.
+                 n_snapshots:int=3, # The number of full solves that are collected before the reduced-order model is used.
+                 max_snapshots:int=30, # The maximal number of snapshots that are kept. If more snapshots are collected, then the oldest ones are discarded.
+                 energy:float=1-1e-10, # The fraction of the snapshot energy that is retained by the POD basis.
+                 tol:float=1e-3 # The maximal relative residual of a reduced solution. Solutions with larger residuals are recomputed with the full solver.
+                ):
+        self.pde_solver = pde_solver
+        self.n_snapshots = n_snapshots
+        self.max_snapshots = max_snapshots
+        self.energy = energy
+        self.tol = tol
+        self.reset()
+        super().__init__(pde_solver.assemble_tensors_when_passed_to_problem)
+
+
+    @property
+    def θ_min(self):
+        return self.pde_solver.θ_min
+
+
+    @property
+    def n_modes(self):
+        return 0 if self._V is None else self._V.shape[1]
+
+
+    def reset(self):
+        """
+        Discards all snapshots, the POD basis and the solve counters.
+        """
+        self._snapshots = []
+        self._V = None
+        self._A_mat = None
+        self.n_full_solves = 0
+        self.n_reduced_solves = 0
+
+
+    def assemble_tensors(self,
+                         problem:"dl4to.problem.Problem" # The problem for which the tensors should be assembled.
+                        ):
+        """
+        Assembles the tensors of the wrapped solver. Since snapshots are only valid for one problem, this also resets the reduced-order model.
+        """
+        self.pde_solver.assemble_tensors(problem)
+        self.reset()
+
+
+    def _add_snapshot(self, u):
+        self._snapshots.append(u.detach().cpu().double().flatten().numpy())
+        self._snapshots = self._snapshots[-self.max_snapshots:]
+        if len(self._snapshots) < self.n_snapshots:
+            return
+
+        W, s, _ = np.linalg.svd(np.stack(self._snapshots, axis=1), full_matrices=False)
+        cumulative_energy = np.cumsum(s ** 2) / np.sum(s ** 2)
+        n_modes = int(np.searchsorted(cumulative_energy, self.energy)) + 1
+        self._V = W[:, :n_modes]
+        self._A_mat = None
+
+
+    def _galerkin_solver(self, A_mat, b):
+        if A_mat is not self._A_mat:
+            self._A_r = self._V.T @ (A_mat @ self._V)
+            self._A_mat = A_mat
+        return self._V @ np.linalg.solve(self._A_r, self._V.T @ b.astype(np.float64))
+
+
+    def _get_reduced_u(self, solution, p=1., binary=False):
+        fdm = self.pde_solver
+        if not fdm.assembled_tensors:
+            fdm.assemble_tensors(solution.problem)
+
+        θ = fdm._get_θ_from_solution(solution, binary=binary, clone=True)
+        θ = θ.clamp(fdm.θ_min, 1)
+        A_mat = fdm._assemble_A(θ.cpu(), p)
+        b = fdm.b.flatten()
+
+        try:
+            u = self._galerkin_solver(A_mat, b.cpu().numpy())
+        except np.linalg.LinAlgError:
+            return None
+
+        residual = np.linalg.norm(A_mat @ u - b.cpu().numpy()) / np.linalg.norm(b.cpu().numpy())
+        if residual > self.tol:
+            return None
+
+        A_op = lambda u, θ: fdm._A(u, θ, p=p)
+        u = AutogradLinearSolver.apply(θ.cpu(), A_op, b, self._galerkin_solver, A_mat, False)
+        return u.view(3, *θ.shape[-3:]).to(θ.device)
+
+
+    def _cached_u(self, solution, binary):
+        return solution.u_binary if binary else solution.u
+
+
+    def solve_pde(self,
+                  solution:"dl4to.solution.Solution", # The solution for which the PDE should be solved.
+                  p:float=1., # The SIMP exponent when solving the PDE. Should usually be left at its default value of `1.`.
+                  binary:bool=False # Whether the densities in the solution should be binarized before solving the PDE.
+                 ):
+        """
+        Solves the pde for `solution` and SIMP exponent `p`, either with the reduced-order model or with the wrapped solver. Returns three `torch.Tensor` objects: displacements `u`, stresses `σ` and von Mises stresses `σ_vm`.
+        """
+        if self._cached_u(solution, binary) is None and self._V is not None:
+            u = self._get_reduced_u(solution, p=p, binary=binary)
+            if u is not None:
+                if binary:
+                    solution.u_binary = u
+                else:
+                    solution.u = u
+                self.n_reduced_solves += 1
+                return self.pde_solver.solve_pde(solution, p=p, binary=binary)
+
+        needs_full_solve = self._cached_u(solution, binary) is None
+        u, σ, σ_vm = self.pde_solver.solve_pde(solution, p=p, binary=binary)
+        if needs_full_solve:
+            self.n_full_solves += 1
+            self._add_snapshot(self._cached_u(solution, binary))
+        return u, σ, σ_vm
\ No newline at end of file
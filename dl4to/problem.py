@@ -142,6 +142,7 @@ class InputCheckerForProblem:
 
 # Internal Cell
 import copy
+import hashlib
 import torch
 import numpy as np
 from typing import Union
@@ -294,6 +295,48 @@ class Problem:
         return copy.deepcopy(self)
 
 
+    def get_fingerprint(self):
+        """
+        Returns a stable hash of the problem as a hexadecimal string. The hash covers the material constants, the voxel size and the tensors `Ω_dirichlet`, `Ω_design` and `F`, but not the name, device or PDE solver of the problem.
+        """
+        fingerprint = hashlib.sha256()
+        fingerprint.update(repr((self.E, self.ν, self.σ_ys, self.h.tolist(), tuple(self.shape), str(self.dtype))).encode())
+        for tensor in [self.Ω_dirichlet, self.Ω_design, self.F]:
+            fingerprint.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+        return fingerprint.hexdigest()
+
+
+    def coarsen(self,
+                factor:int=2 # The factor by which the number of voxels is reduced in each coordinate direction.
+               ):
+        """
+        Returns a coarser version of the problem, in which blocks of `factor`x`factor`x`factor` voxels are merged into single voxels with `factor` times larger edges.
+        Forces are summed up over each block and rescaled with the block volume, such that the total force is preserved. Dirichlet boundary conditions and voxels that are fixed to be solid are kept if they occur anywhere in a block,
+        whereas voxels are only fixed to be void if the whole block is void. The PDE solver of the problem is attached to the coarse problem as well.
+        Length scales that are given in voxels, e.g., the filter size of a density representer, need to be divided by `factor` to cover the same physical length on the coarse problem.
+        """
+        def max_pool(tensor):
+            return torch.nn.functional.max_pool3d(tensor.unsqueeze(0).type(self.dtype), factor, ceil_mode=True).squeeze(0)
+
+        Ω_dirichlet = max_pool(self.Ω_dirichlet)
+        solid = max_pool(self.Ω_design == 1)
+        void = -max_pool(-(self.Ω_design == 0).type(self.dtype))
+        Ω_design = torch.where(solid == 1, 1., torch.where(void == 1, 0., -1.))
+        F = torch.nn.functional.avg_pool3d(self.F.unsqueeze(0), factor, ceil_mode=True, divisor_override=1).squeeze(0) / factor ** 3
+
+        return Problem(
+            E=self.E, ν=self.ν, σ_ys=self.σ_ys, h=self.h * factor,
+            Ω_dirichlet=Ω_dirichlet,
+            Ω_design=Ω_design,
+            F=F,
+            pde_solver=self.pde_solver,
+            name=self.name,
+            device=self.device,
+            dtype=self.dtype,
+            restrict_density_for_voxels_with_applied_forces=False
+        )
+
+
     def plot(self,
              display:bool=True, # Whether the figure is displayed.
              file_path:str=None, # Path where the figure is saved.
@@ -137,10 +137,46 @@ class Solution:
         self.enforce_θ_on_Ω_design = enforce_θ_on_Ω_design
         self.name = name
         self._problem = problem
+        self.field_cache_hits = 0
+        self.field_cache_misses = 0
+        self._get_deferred_θ = None
         self.θ = θ
         self._check_θ_shape_and_range()
 
 
+    @property
+    def _θ(self):
+        if self._get_deferred_θ is not None:
+            self._θ_tensor = self._get_deferred_θ()
+            self._get_deferred_θ = None
+        return self._θ_tensor
+
+
+    @_θ.setter
+    def _θ(self, θ):
+        self._θ_tensor = θ
+        self._get_deferred_θ = None
+
+
+    def _set_deferred_θ(self, get_θ):
+        # `get_θ` is only called when θ is accessed for the first time, and its output is used as is.
+        self._get_deferred_θ = get_θ
+        self.clear_field_cache()
+
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_θ_tensor'], state['_get_deferred_θ'] = self._θ, None
+        return state
+
+
+    def __setstate__(self, state):
+        if '_θ' in state: # Solutions that were pickled before θ could be deferred.
+            state['_θ_tensor'] = state.pop('_θ')
+        state.setdefault('_get_deferred_θ', None)
+        self.__dict__.update(state)
+
+
     @property
     def θ(self):
         return self._θ
@@ -152,8 +188,7 @@ class Solution:
         if self.enforce_θ_on_Ω_design:
             Ω_design = self.problem.Ω_design.to(θ_new.device)
             self._θ = torch.where(Ω_design == -1., self.θ, Ω_design.type(self.θ.dtype))
-        self.u = None
-        self.u_binary = None
+        self.clear_field_cache()
 
 
     @property
@@ -164,8 +199,7 @@ class Solution:
     @pde_solver.setter
     def pde_solver(self, new_pde_solver):
         self.problem._pde_solver = new_pde_solver
-        self.u = None
-        self.u_binary = None
+        self.clear_field_cache()
 
 
     @property
@@ -203,6 +237,15 @@ class Solution:
             self.u_binary = self.u_binary.to(device)
 
 
+    def clear_field_cache(self):
+        """
+        Discards the cached displacements and stresses of the solution. This is done automatically whenever `θ` or the PDE solver are replaced.
+        """
+        self.u = None
+        self.u_binary = None
+        self._field_cache = {}
+
+
     def to(self, device):
         """
         Moves the solution object to `device`.
@@ -298,16 +341,42 @@ class Solution:
                  ):
         """
         Solves the PDE of linear elasticity for the current solution. Returns the displacement tensor, stress tensor and the von Mises stress tensor.
+        The results are cached for each combination of `p` and `binary`, such that several criteria that evaluate the same solution only solve the PDE once.
+        Cached fields are recomputed if `θ` has been modified in-place, or if gradients are required but the cached fields were computed without them.
         """
         if self.pde_solver is None:
             raise AttributeError("solution.problem has no PDE solver attached to it.")
+
+        key = (float(p), bool(binary))
+        θ_version = self._θ._version
+        requires_graph = torch.is_grad_enabled() and self._θ.requires_grad
+        if key in self._field_cache:
+            fields, cached_θ_version, has_graph = self._field_cache[key]
+            if cached_θ_version == θ_version and (has_graph or not requires_graph):
+                self.field_cache_hits += 1
+                return fields
+
+        self.field_cache_misses += 1
+        if key in self._field_cache:
+            if binary:
+                self.u_binary = None
+            else:
+                self.u = None
+
         u, σ, σ_vm = self.pde_solver(self, p=p, binary=binary)
         u = u.to(self.θ.device)
         σ = σ.to(self.θ.device)
         σ_vm = σ_vm.to(self.θ.device)
+        self._field_cache[key] = ((u, σ, σ_vm), θ_version, requires_graph)
         return u, σ, σ_vm
 
 
+    @property
+    def field_cache_hit_rate(self):
+        n_requests = self.field_cache_hits + self.field_cache_misses
+        return self.field_cache_hits / n_requests if n_requests > 0 else 0.
+
+
     def _check_θ_shape_and_range(self, θ=None):
         if θ is None:
             θ = self.θ
@@ -1,9 +1,104 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: notebooks/topo_solvers/7_trainable_topo_solver.ipynb (unless otherwise specified).
 
-__all__ = ['TrainModule', 'TopoSolver', 'TrivialSolver', 'SIMPIterator', 'SIMP', 'OracleSolver', 'TrainableTopoSolver']
+__all__ = ['TrainModule', 'TopoSolver', 'ResultCache', 'TrivialSolver', 'SIMPIterator', 'BatchedSIMPIterator',
+           'UpdateRule', 'AdamUpdateRule', 'OCUpdateRule', 'MMAUpdateRule', 'SIMPLoggingPolicy', 'SIMP',
+           'SIMPTrajectory', 'OracleSolver', 'TrainableTopoSolver']
 
 # Internal Cell
+import csv
 import torch
+import numpy as np
+import multiprocessing
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Internal Cell
+class StreamingAccumulator:
+    """
+    Accumulates summary statistics of a stream of values without storing them. Each batch of values is merged in constant time with Chan's parallel variant of Welford's algorithm.
+    Optionally, a fixed-size reservoir of uniformly sampled values is kept to estimate quantiles.
+    """
+    def __init__(self,
+                 n_reservoir_samples:int=0, # The number of values that are kept for estimating quantiles. If 0, then no quantiles are estimated.
+                 seed:int=0 # The seed of the random number generator used for reservoir sampling.
+                ):
+        self.n_reservoir_samples = n_reservoir_samples
+        self.count = 0
+        self.mean = 0.
+        self.M2 = 0.
+        self.min = np.inf
+        self.max = -np.inf
+        self.reservoir = np.empty(0)
+        self._rng = np.random.default_rng(seed)
+
+
+    @property
+    def var(self):
+        return self.M2 / self.count if self.count > 0 else np.nan
+
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+
+    def _update_reservoir(self, values):
+        n_missing = self.n_reservoir_samples - len(self.reservoir)
+        self.reservoir = np.concatenate([self.reservoir, values[:n_missing]])
+        values = values[n_missing:]
+        if len(values) == 0:
+            return
+        indices = self.count + n_missing + np.arange(len(values))
+        slots = self._rng.integers(0, indices + 1)
+        replace = slots < self.n_reservoir_samples
+        self.reservoir[slots[replace]] = values[replace]
+
+
+    def update(self,
+               values:np.ndarray # A batch of values that is added to the statistics.
+              ):
+        """
+        Adds a batch of values to the accumulated statistics.
+        """
+        values = np.asarray(values, dtype=np.float64).flatten()
+        if len(values) == 0:
+            return
+        if self.n_reservoir_samples > 0:
+            self._update_reservoir(values)
+
+        n_batch = len(values)
+        mean_batch = values.mean()
+        M2_batch = ((values - mean_batch) ** 2).sum()
+        count = self.count + n_batch
+        δ = mean_batch - self.mean
+        self.mean += δ * n_batch / count
+        self.M2 += M2_batch + δ ** 2 * self.count * n_batch / count
+        self.count = count
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+
+    def quantile(self,
+                 q:float # The quantile that should be estimated, between 0 and 1.
+                ):
+        """
+        Returns an estimate of the `q`-quantile of all values, based on the reservoir samples.
+        """
+        if len(self.reservoir) == 0:
+            return np.nan
+        return float(np.quantile(self.reservoir, q))
+
+
+    def get_summary(self,
+                    quantiles:tuple=(.05, .25, .5, .75, .95) # The quantiles that are included if reservoir sampling is enabled.
+                   ):
+        """
+        Returns a dictionary with the count, mean, standard deviation, minimum, maximum and, if reservoir sampling is enabled, quantile estimates of all values.
+        """
+        summary = {"count": self.count, "mean": float(self.mean), "std": float(self.std), "min": float(self.min), "max": float(self.max)}
+        if self.n_reservoir_samples > 0:
+            summary["quantiles"] = {str(q): self.quantile(q) for q in quantiles}
+        return summary
 
 # Internal Cell
 class EvalModule:
@@ -19,22 +114,66 @@ class EvalModule:
 
     @staticmethod
     @torch.no_grad()
-    def _run_epoch(topo_solver, dataloader, criteria):
-        criteria_dict = defaultdict(list)
+    def _evaluate_batch(topo_solver, criteria, problems_or_solutions, gt_solutions):
+        EvalModule._push_to_device(gt_solutions, device=topo_solver.device)
+        solutions = topo_solver(problems_or_solutions, eval_mode=True)
 
-        for problems_or_solutions, gt_solutions in dataloader:
-            EvalModule._push_to_device(gt_solutions, device=topo_solver.device)
-            solutions = topo_solver(problems_or_solutions, eval_mode=True)
+        assert solutions[0].θ.device == gt_solutions[0].θ.device, f"EvalModule: {solutions[0].θ.device=}, but {gt_solutions[0].θ.device=}."
+
+        batch_values = []
+        for criterion in criteria:
+            criterion_values = criterion(solutions, gt_solutions, binary=True)
+            batch_values.append(criterion_values.detach().cpu().double().numpy().flatten())
+        return batch_values
+
+
+    @staticmethod
+    def _evaluate_batches(topo_solver, dataloader, criteria, n_workers):
+        if n_workers == 0:
+            for problems_or_solutions, gt_solutions in dataloader:
+                yield EvalModule._evaluate_batch(topo_solver, criteria, problems_or_solutions, gt_solutions)
+            return
 
-            assert solutions[0].θ.device == gt_solutions[0].θ.device, f"EvalModule: {solutions[0].θ.device=}, but {gt_solutions[0].θ.device=}."
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_eval_worker,
+                                 initargs=(topo_solver, criteria)) as executor:
+            pending = deque()
+            for batch in dataloader:
+                pending.append(executor.submit(_evaluate_batch_in_worker, batch))
+                if len(pending) >= 2 * n_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
 
-            for criterion in criteria:
-                criterion_values = criterion(solutions, gt_solutions, binary=True)
-                criterion_values = list(criterion_values.detach().cpu().numpy())
-                criteria_dict[criterion.name] += criterion_values
 
-            for criterion in criteria:
-                criteria_dict[criterion.name] = list(np.float_(criteria_dict[criterion.name]))
+    @staticmethod
+    @torch.no_grad()
+    def _run_epoch(topo_solver, dataloader, criteria, keep_values=True, values_file_path=None, n_reservoir_samples=0, n_workers=0):
+        criteria_dict = defaultdict(list)
+        accumulators = {criterion.name: StreamingAccumulator(n_reservoir_samples) for criterion in criteria}
+        values_file = None
+        if values_file_path is not None:
+            values_file = open(values_file_path, 'a', newline='')
+            writer = csv.writer(values_file)
+            if values_file.tell() == 0:
+                writer.writerow([criterion.name for criterion in criteria])
+
+        try:
+            for batch_values in EvalModule._evaluate_batches(topo_solver, dataloader, criteria, n_workers):
+                for criterion, criterion_values in zip(criteria, batch_values):
+                    accumulators[criterion.name].update(criterion_values)
+                    if keep_values:
+                        criteria_dict[criterion.name].extend(criterion_values.tolist())
+
+                if values_file is not None:
+                    writer.writerows(zip(*batch_values))
+        finally:
+            if values_file is not None:
+                values_file.close()
+
+        for criterion in criteria:
+            criteria_dict[f"{criterion.name}_summary"] = accumulators[criterion.name].get_summary()
 
         return criteria_dict
 
@@ -64,9 +203,12 @@ class EvalModule:
 
 
     @staticmethod
-    def __call__(topo_solver, criteria, dataloader):
+    def __call__(topo_solver, criteria, dataloader, keep_values=True, values_file_path=None, n_reservoir_samples=0, n_workers=0):
         """
-        Evalate criteria with outputs from the topo solver.
+        Evalate criteria with outputs from the topo solver. For each criterion, the returned dictionary contains a summary with the count, mean, standard deviation, minimum and maximum of its values under the key `f"{criterion.name}_summary"`,
+        which is accumulated in a streaming fashion. If `n_reservoir_samples > 0`, then the summary also contains quantile estimates. The per-sample values are only kept in memory under the key `criterion.name` if `keep_values=True`.
+        If `values_file_path` is given, then the per-sample values are appended to that csv file.
+        If `n_workers > 0`, then the batches of the dataloader are distributed over a pool of `n_workers` processes, which run the topo solver and evaluate the criteria. The results are merged in the order of the dataloader.
 
         Returns
         -------
@@ -76,9 +218,27 @@ class EvalModule:
             topo_solver=topo_solver,
             dataloader=dataloader,
             criteria=criteria,
+            keep_values=keep_values,
+            values_file_path=values_file_path,
+            n_reservoir_samples=n_reservoir_samples,
+            n_workers=n_workers
         )
         return criteria_dict
 
+# Internal Cell
+_eval_worker_state = {}
+
+
+def _init_eval_worker(topo_solver, criteria):
+    torch.set_num_threads(1)
+    _eval_worker_state['topo_solver'] = topo_solver
+    _eval_worker_state['criteria'] = criteria
+
+
+def _evaluate_batch_in_worker(batch):
+    problems_or_solutions, gt_solutions = batch
+    return EvalModule._evaluate_batch(_eval_worker_state['topo_solver'], _eval_worker_state['criteria'], problems_or_solutions, gt_solutions)
+
 # Internal Cell
 import copy
 import time
@@ -307,9 +467,17 @@ class TrainModule:
         print(f'Finished training after {epoch + 1} epochs.\n')
 
 # Internal Cell
+import os
+import pickle
 import copy
+import json
+import types
 import torch
+import hashlib
+import inspect
+import numpy as np
 from typing import Union
+from collections import OrderedDict
 
 from .solution import Solution
 from .utils import get_dataloader, cast_to_solutions, save_dict_as_txt, create_dir
@@ -329,6 +497,7 @@ class TopoSolver:
         self.name = name
         self._trainable = trainable
         self._differentiable = differentiable
+        self.result_cache = None
 
 
     @property
@@ -403,6 +572,32 @@ class TopoSolver:
         raise NotImplementedError("Must be overridden.")
 
 
+    def _get_cache_config(self):
+        return describe_constructor_args(self)
+
+
+    def _get_cache_keys(self, solutions):
+        config = json.dumps(self._get_cache_config(), sort_keys=True, default=str)
+        config_fingerprint = hashlib.sha256(config.encode()).hexdigest()
+        keys = []
+        for solution in solutions:
+            pde_solver_config = json.dumps(describe_config(solution.problem.pde_solver), sort_keys=True, default=str)
+            keys.append(hashlib.sha256((config_fingerprint + solution.problem.get_fingerprint() + pde_solver_config).encode()).hexdigest())
+        return keys
+
+
+    def _get_new_solutions_with_cache(self, solutions, eval_mode):
+        keys = self._get_cache_keys(solutions)
+        new_solutions = [self.result_cache.get(key, problem=solution.problem) for key, solution in zip(keys, solutions)]
+        missing_indices = [i for i, new_solution in enumerate(new_solutions) if new_solution is None]
+        if len(missing_indices) > 0:
+            computed_solutions = self._get_new_solutions([solutions[i] for i in missing_indices], eval_mode)
+            for i, new_solution in zip(missing_indices, computed_solutions):
+                self.result_cache.put(keys[i], new_solution)
+                new_solutions[i] = new_solution
+        return new_solutions
+
+
     def __call__(self,
                  problems_or_solutions:list, # A list containing problem and solution objects.
                  eval_mode:bool=True # Determines whether to calculate gradients for the backwards pass or not. If `True`, then no gradients are calculated.
@@ -410,9 +605,13 @@ class TopoSolver:
         """
         Perform a forward pass of the topo solver. Expects a list of problems or solutions.
         Returns a `dl4to.solution.Solution` object or a list of solutions, if the input was also a list.
+        If a `ResultCache` is assigned to `result_cache` and `eval_mode=True`, then solutions of problems that were already solved with the same configuration are loaded from the cache.
         """
         solutions, was_list = self._prepare_input_in_call(problems_or_solutions)
-        solutions = self._get_new_solutions(solutions, eval_mode)
+        if self.result_cache is not None and eval_mode:
+            solutions = self._get_new_solutions_with_cache(solutions, eval_mode)
+        else:
+            solutions = self._get_new_solutions(solutions, eval_mode)
 
         if was_list:
             return solutions
@@ -423,7 +622,11 @@ class TopoSolver:
     def eval(self,
              root:str, # The root directory where the evaluation results are saved.
              criteria:list, # A list of `dl4to.criteria.Criterion` objects that are used for the evaluation.
-             dataloader:torch.utils.data.DataLoader # The dataloader that is used for retrieving the validation data.
+             dataloader:torch.utils.data.DataLoader, # The dataloader that is used for retrieving the validation data.
+             keep_values:bool=True, # Whether the per-sample criterion values are kept in memory and returned. Streaming summaries of the values are always returned.
+             save_values:bool=False, # Whether the per-sample criterion values are appended to a csv file in the evaluation directory.
+             n_reservoir_samples:int=0, # The number of reservoir samples per criterion that are used to estimate quantiles. If 0, then no quantiles are estimated.
+             n_workers:int=0 # The number of worker processes that run the topo solver and evaluate the criteria in parallel. If 0, then everything is evaluated in the main process.
             ):
         """
         Evalate criteria with outputs from the topo solver. Returns a `collections.defaultdict` dictionary.
@@ -433,7 +636,11 @@ class TopoSolver:
         logs = EvalModule()(
             topo_solver=self,
             criteria=criteria,
-            dataloader=dataloader
+            dataloader=dataloader,
+            keep_values=keep_values,
+            values_file_path=f"{dir_path}/eval_values.csv" if save_values else None,
+            n_reservoir_samples=n_reservoir_samples,
+            n_workers=n_workers
         )
 
         save_dict_as_txt(my_dict=logs, dir_path=dir_path, file_name="eval_logs")
@@ -472,6 +679,185 @@ class TopoSolver:
                 export_png=export_png
             )
 
+# Internal Cell
+def describe_config(obj, depth=5):
+    """
+    Returns a JSON-serializable description of `obj` that only changes if the configuration that `obj` represents changes.
+    Tensors and neural networks are described by hashes of their values, and other objects by the attributes that correspond to the arguments of their constructor.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, torch.dtype):
+        return str(obj)
+    if isinstance(obj, torch.Tensor):
+        data = obj.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy()
+        return {"dtype": str(obj.dtype), "shape": list(obj.shape), "sha256": hashlib.sha256(data.tobytes()).hexdigest()}
+    if isinstance(obj, (list, tuple)):
+        return [describe_config(value, depth) for value in obj]
+    if isinstance(obj, (set, frozenset)):
+        return sorted(repr(value) for value in obj)
+    if isinstance(obj, dict):
+        return {str(key): describe_config(value, depth) for key, value in obj.items()}
+    if hasattr(obj, 'get_fingerprint'):
+        return obj.get_fingerprint()
+    if isinstance(obj, torch.nn.Module):
+        return {"type": f"{type(obj).__module__}.{type(obj).__qualname__}", "state_dict": describe_config(dict(obj.state_dict()), depth)}
+    if isinstance(obj, (types.FunctionType, types.BuiltinFunctionType, types.MethodType)):
+        return f"{obj.__module__}.{obj.__qualname__}"
+    if depth == 0:
+        return f"{type(obj).__module__}.{type(obj).__qualname__}"
+    return describe_constructor_args(obj, depth=depth - 1)
+
+
+def describe_constructor_args(obj, exclude=(), depth=5):
+    """
+    Describes `obj` by its type and by the attributes `name` or `_name` for each argument `name` of its constructor, except for those in `exclude`.
+    """
+    description = {"type": f"{type(obj).__module__}.{type(obj).__qualname__}"}
+    try:
+        parameters = inspect.signature(type(obj).__init__).parameters.values()
+    except (TypeError, ValueError):
+        return description
+    for parameter in parameters:
+        if parameter.name == 'self' or parameter.name in exclude or parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        for name in [parameter.name, f"_{parameter.name}"]:
+            if name in vars(obj) or hasattr(type(obj), name):
+                description[parameter.name] = describe_config(getattr(obj, name), depth)
+                break
+    return description
+
+# Cell
+class ResultCache:
+    """
+    A content-addressed cache for the solutions of topo solvers, which is stored on the local disk. If the total size of the cached solutions exceeds `max_size`, then the least recently used solutions are evicted.
+    A cache is used by a topo solver after assigning it to `topo_solver.result_cache`. The solutions are keyed by a hash of the problem and the configuration of the topo solver.
+    Only the densities and logs of single solutions are stored, i.e., intermediate solutions are not cached.
+    """
+    def __init__(self,
+                 root:str, # The directory in which the cached solutions are stored. Solutions that are already stored in the directory are reused.
+                 max_size:int=2**30 # The maximal total size of the cached solutions in bytes.
+                ):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        entries = []
+        for name in os.listdir(root):
+            if name.endswith('.pt'):
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, name[:-3], stat.st_size))
+        self._entries = OrderedDict((key, size) for _, key, size in sorted(entries))
+
+
+    def _get_path(self, key):
+        return os.path.join(self.root, f"{key}.pt")
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    @property
+    def size(self):
+        """
+        The total size of the cached solutions in bytes.
+        """
+        return sum(self._entries.values())
+
+
+    @property
+    def hit_rate(self):
+        """
+        The fraction of lookups that were answered by the cache.
+        """
+        n_lookups = self.hits + self.misses
+        return self.hits / n_lookups if n_lookups > 0 else 0.
+
+
+    def get_stats(self):
+        """
+        Returns the number of hits and misses, the hit rate, the number of cached solutions and their total size in bytes as a dictionary.
+        """
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate, "n_entries": len(self), "size": self.size}
+
+
+    def get(self,
+            key:str, # The key of the solution.
+            problem:"dl4to.problem.Problem" # The problem to which the cached solution belongs.
+           ):
+        """
+        Returns the cached solution for `key`, or `None` if no solution is cached for `key`.
+        Solutions whose files were removed in the meantime, e.g., by another cache on the same directory, or that cannot be read count as misses.
+        """
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        path = self._get_path(key)
+        try:
+            entry = torch.load(path)
+            os.utime(path)
+        except (OSError, EOFError, RuntimeError, pickle.UnpicklingError):
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        solution = Solution(problem=problem, θ=entry["θ"].to(problem.device), name=entry["name"])
+        if entry["logs"] is not None:
+            solution.logs = entry["logs"]
+        return solution
+
+
+    def put(self,
+            key:str, # The key of the solution.
+            solution:"dl4to.solution.Solution" # The solution that is cached. Other objects, e.g., lists of intermediate solutions, are ignored.
+           ):
+        """
+        Stores `solution` under `key` and evicts the least recently used solutions if the cache exceeds its maximal size.
+        """
+        if not isinstance(solution, Solution):
+            return
+        logs = getattr(solution, 'logs', None)
+        entry = {"θ": solution.θ.detach().cpu(), "name": solution.name, "logs": None if logs is None else dict(logs)}
+        path = self._get_path(key)
+        torch.save(entry, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        self._entries[key] = os.path.getsize(path)
+        self._entries.move_to_end(key)
+        self._evict()
+
+
+    def _evict(self):
+        size = self.size
+        while size > self.max_size and len(self._entries) > 1:
+            key, entry_size = self._entries.popitem(last=False)
+            self._remove(key)
+            size -= entry_size
+
+
+    def _remove(self, key):
+        try:
+            os.remove(self._get_path(key))
+        except FileNotFoundError:
+            pass
+
+
+    def clear(self):
+        """
+        Removes all cached solutions and resets the statistics.
+        """
+        for key in self._entries:
+            self._remove(key)
+        self._entries.clear()
+        self.hits, self.misses = 0, 0
+
 # Internal Cell
 import os
 import torch
@@ -515,9 +901,12 @@ class TrivialSolver(TopoSolver):
         return solutions
 
 # Cell
+import copy
+import math
 import time
 import torch
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from .solution import Solution
 from .criteria import VolumeFraction, Binariness
@@ -532,10 +921,16 @@ class SIMPIterator:
         problem:"dl4to.problem.Problem", # The problem that should be solved by SIMP.
         criterion:"dl4to.criteria.Criterion", # The objective function that should be optimized for in the optimization process.
         density_representer:"dl4to.density_representers.DensityRepresenter", # The density representer that is used for the latent density representation. The density representer also performs the projection, smoothing and filtering.
-        lr:float, # The learning rate of the `torch.optim.Adam` optimizer.
-        binarizer_steepening_factor:float # The factor at which the binarizer should be steepened in each iteration. E.g.,a value of 1.1 corresponds to a steepening of 10% per iteration.
+        lr:float, # The learning rate of the `torch.optim.Adam` optimizer. Only used if no `update_rule` is given.
+        binarizer_steepening_factor:float, # The factor at which the binarizer should be steepened in each iteration. E.g.,a value of 1.1 corresponds to a steepening of 10% per iteration.
+        update_rule:"UpdateRule"=None, # The rule that updates the density representer in each iteration. If `None`, then `AdamUpdateRule(lr=lr)` is used.
+        logging_policy:"SIMPLoggingPolicy"=None # Determines which metrics are logged in which iterations. If `None`, then all metrics are logged in every iteration.
     ):
         self.lr = lr
+        self.logging_policy = SIMPLoggingPolicy() if logging_policy is None else logging_policy
+        self.iteration = 0
+        self.n_logged_iterations = 0
+        self.logged_last_iteration = False
         self.logs = defaultdict(list)
         self.binarizer_steepening_factor = binarizer_steepening_factor
         self.problem = problem
@@ -544,21 +939,121 @@ class SIMPIterator:
         self.volume_crit = VolumeFraction()
         self.binariness_crit = Binariness()
         self.density_representer = density_representer
-        self.optimizer = torch.optim.Adam(self.density_representer.parameters(), lr=self.lr)
+        self.update_rule = AdamUpdateRule(lr=self.lr) if update_rule is None else update_rule
+        self.update_rule.setup(self.density_representer, volume_fct=self._get_volume_fraction)
+        self._filtered_θ_cache = None
+
+
+    def _get_filtered_θ(self):
+        parameters = tuple(self.density_representer.parameters())
+        versions = tuple(parameter._version for parameter in parameters)
+        if self._filtered_θ_cache is not None:
+            cached_parameters, cached_versions, filtered_θ = self._filtered_θ_cache
+            if cached_versions == versions and all(p is q for p, q in zip(cached_parameters, parameters)):
+                return filtered_θ
+        filtered_θ = self.density_representer._apply_density_representer()
+        self._filtered_θ_cache = (parameters, versions, filtered_θ)
+        return filtered_θ
+
+
+    def _get_θ(self):
+        return self.density_representer._apply_binarizer_and_projection(self._get_filtered_θ())
+
+
+    def _get_deferred_θ(self):
+        filtered_θ = self._get_filtered_θ()
+        binarizer_strength = self.density_representer.binarizer_strength
+        Ω_design_masks = self.density_representer._get_Ω_design_masks()
+        θ = None
+        def get_θ():
+            nonlocal θ
+            if θ is None:
+                θ = self.density_representer._apply_binarizer_and_projection(filtered_θ, binarizer_strength, Ω_design_masks)
+            return θ
+        return get_θ
+
+
+    def _get_solution(self, problem, θ):
+        solution = Solution(problem=problem, θ=θ, enforce_θ_on_Ω_design=False)
+        solution.enforce_θ_on_Ω_design = True
+        return solution
+
+
+    def _set_deferred_θ(self, solution, get_θ):
+        solution._set_deferred_θ(get_θ)
+
+
+    def _get_volume_fraction(self):
+        solution = Solution(problem=self.problem, θ=self.density_representer())
+        return self.volume_crit([solution])
+
 
+    def _get_logged_metrics(self):
+        if self.logging_policy.is_logging_iteration(self.iteration):
+            return self.logging_policy.metrics
+        return set()
 
-    def _extend_logs(self, solution, loss, volume, tick, σ_vm):
-        self.logs["losses"].append(loss.item())
-        self.logs["volumes"].append(volume.item())
-        self.logs["durations"].append(time.time() - tick)
-        self.logs["binarinesses"].append(self.binariness_crit([solution]))
-        self.logs["relative_max_σ_vm"].append(σ_vm.max().item() / self.problem.σ_ys)
+
+    def _extend_logs(self, logs, solution, loss, volume, tick, σ_vm, θ_previous):
+        metrics = {
+            "losses": lambda: loss.detach(),
+            "max_density_changes": lambda: (solution.θ.detach() - θ_previous).abs().max(),
+            "volumes": lambda: volume,
+            "durations": lambda: time.time() - tick,
+            "binarinesses": lambda: self.binariness_crit([solution]).detach(),
+            "relative_max_σ_vm": lambda: σ_vm.detach().max() / solution.problem.σ_ys
+        }
+        for name in self.logging_policy.all_metrics:
+            if name in self.logging_policy.metrics:
+                value = metrics[name]()
+                if name in self.logging_policy.scalar_metrics and not self.logging_policy.deferred:
+                    value = value.item()
+                logs[name].append(value)
+
+
+    def _count_iteration(self, logged):
+        self.iteration += 1
+        self.n_logged_iterations += int(logged)
+        self.logged_last_iteration = logged
+
+
+    def state_dict(self):
+        """
+        Returns a copy of the optimization state, i.e., the parameters and the binarizer strength of the density representer, the state of the update rule, the iteration counters and the logs.
+        """
+        return copy.deepcopy({
+            "density_representer": self.density_representer.state_dict(),
+            "binarizer_strength": self.density_representer.binarizer_strength,
+            "update_rule": self.update_rule.state_dict(),
+            "iteration": self.iteration,
+            "n_logged_iterations": self.n_logged_iterations,
+            "logged_last_iteration": self.logged_last_iteration,
+            "logs": [dict(logs) for logs in self.logs] if type(self.logs) == list else dict(self.logs)
+        })
+
+
+    def load_state_dict(self,
+                        state_dict:dict # A dictionary that was created with `state_dict`.
+                       ):
+        """
+        Restores the optimization state, such that the optimization continues exactly as if it had never been interrupted.
+        """
+        self.density_representer.load_state_dict(state_dict["density_representer"])
+        self.density_representer.binarizer_strength = state_dict["binarizer_strength"]
+        self.update_rule.load_state_dict(state_dict["update_rule"])
+        self.iteration = state_dict["iteration"]
+        self.n_logged_iterations = state_dict["n_logged_iterations"]
+        self.logged_last_iteration = state_dict["logged_last_iteration"]
+        all_logs = self.logs if type(self.logs) == list else [self.logs]
+        saved_logs = state_dict["logs"] if type(state_dict["logs"]) == list else [state_dict["logs"]]
+        for logs, saved in zip(all_logs, saved_logs):
+            logs.clear()
+            logs.update(saved)
 
 
     def _perform_optimizer_step(self, loss):
-        self.optimizer.zero_grad()
-        loss.backward()
-        self.optimizer.step()
+        self.update_rule.step(loss)
+        self._filtered_θ_cache = None # Update rules may replace the parameter data without changing its version.
 
 
     def __call__(self,
@@ -569,31 +1064,415 @@ class SIMPIterator:
         Returns a `dl4to.solution.Solution` object.
         """
         tick = time.time()
-        solution = Solution(
-            problem=self.problem,
-            θ=self.density_representer(),
-        )
+        logged_metrics = self._get_logged_metrics()
+        solution = self._get_solution(self.problem, self._get_θ())
 
         u, σ, σ_vm = solution.solve_pde(p=p)
         loss = self.criterion([solution])
-        volume = self.volume_crit([solution])
+        volume = self.volume_crit([solution]).detach() if "volumes" in logged_metrics else None
 
+        θ_previous = solution.θ.detach()
         self._perform_optimizer_step(loss)
-        solution.θ = self.density_representer()
+        self._set_deferred_θ(solution, self._get_deferred_θ())
         self.density_representer.steepen_binarizer(self.binarizer_steepening_factor)
 
-        self._extend_logs(solution, loss, volume, tick, σ_vm)
+        if logged_metrics:
+            self._extend_logs(self.logs, solution, loss, volume, tick, σ_vm, θ_previous)
+        self._count_iteration(logged=bool(logged_metrics))
         solution.logs = self.logs
 
         return solution
 
 # Cell
+class BatchedSIMPIterator(SIMPIterator):
+    """
+    Performs the SIMP optimization for a batch of problems with the same shape in lockstep. The density representer needs to return stacked densities of shape (B, 1, X, Y, Z), e.g., a `BatchedFilteringDensityRepresenter`.
+    In each iteration, the PDEs of all problems are solved concurrently and the densities of all problems are updated with a single optimizer step.
+    """
+    def __init__(
+        self,
+        problems:list, # The problems that should be solved by SIMP. All problems need to have the same shape.
+        criterion:"dl4to.criteria.Criterion", # The objective function that should be optimized for in the optimization process.
+        density_representer:"dl4to.density_representers.BatchedFilteringDensityRepresenter", # The density representer that is used for the stacked latent density representations of all problems.
+        lr:float, # The learning rate of the `torch.optim.Adam` optimizer. Only used if no `update_rule` is given.
+        binarizer_steepening_factor:float, # The factor at which the binarizer should be steepened in each iteration. E.g.,a value of 1.1 corresponds to a steepening of 10% per iteration.
+        update_rule:"UpdateRule"=None, # The rule that updates the density representer in each iteration. Update rules that enforce a volume constraint, like `OCUpdateRule` and `MMAUpdateRule`, are not supported for batches. If `None`, then `AdamUpdateRule(lr=lr)` is used.
+        logging_policy:"SIMPLoggingPolicy"=None, # Determines which metrics are logged in which iterations. If `None`, then all metrics are logged in every iteration.
+        n_workers:int=None # The number of threads that are used to solve the PDEs concurrently. If `None`, then one thread per problem is used.
+    ):
+        if isinstance(update_rule, LatentDensityUpdateRule):
+            raise ValueError(f"BatchedSIMPIterator: {type(update_rule).__name__} does not support batches of problems.")
+        self.problems = problems
+        self.n_workers = len(problems) if n_workers is None else n_workers
+        super().__init__(
+            problem=problems[0],
+            criterion=criterion,
+            density_representer=density_representer,
+            lr=lr,
+            binarizer_steepening_factor=binarizer_steepening_factor,
+            update_rule=update_rule,
+            logging_policy=logging_policy
+        )
+        self.logs = [defaultdict(list) for _ in problems]
+
+
+    def _get_solutions(self, θ):
+        return [self._get_solution(problem, θ_problem) for problem, θ_problem in zip(self.problems, θ)]
+
+
+    def _get_volume_fraction(self):
+        return self.volume_crit(self._get_solutions(self.density_representer()))
+
+
+    def _solve_pdes(self, solutions, p):
+        if self.n_workers <= 1:
+            return [solution.solve_pde(p=p) for solution in solutions]
+        with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+            return list(executor.map(lambda solution: solution.solve_pde(p=p), solutions))
+
+
+    def __call__(self,
+                 p:float # The SIMP exponent
+                ):
+        """
+        Creates the SIMP solution objects for all problems, solves the PDEs concurrently and communicates with the density representer.
+        Returns a list of `dl4to.solution.Solution` objects.
+        """
+        tick = time.time()
+        logged_metrics = self._get_logged_metrics()
+        solutions = self._get_solutions(self._get_θ())
+
+        fields = self._solve_pdes(solutions, p)
+        losses = self.criterion(solutions)
+        volumes = self.volume_crit(solutions).detach() if "volumes" in logged_metrics else [None] * len(solutions)
+
+        θ_previous = [solution.θ.detach() for solution in solutions]
+        self._perform_optimizer_step(losses.sum())
+        get_θ = self._get_deferred_θ()
+        self.density_representer.steepen_binarizer(self.binarizer_steepening_factor)
+
+        for i, solution in enumerate(solutions):
+            self._set_deferred_θ(solution, lambda i=i: get_θ()[i])
+            if logged_metrics:
+                self._extend_logs(self.logs[i], solution, losses[i], volumes[i], tick, fields[i][2], θ_previous[i])
+            solution.logs = self.logs[i]
+        self._count_iteration(logged=bool(logged_metrics))
+
+        return solutions
+
+# Cell
+class UpdateRule:
+    """
+    A parent class for update rules that modify the parameters of a density representer in each SIMP iteration, based on the gradient of the loss.
+    """
+    def setup(self,
+              density_representer:"dl4to.density_representers.DensityRepresenter", # The density representer whose parameters are updated.
+              volume_fct:callable # A function that returns the differentiable volume fraction of the density that is currently produced by the density representer.
+             ):
+        """
+        Prepares the update rule for a new optimization run and resets its internal state.
+        """
+        self.density_representer = density_representer
+        self.volume_fct = volume_fct
+        self._setup()
+
+
+    def _setup(self):
+        pass
+
+
+    def step(self,
+             loss:torch.Tensor # The loss of the current SIMP iteration.
+            ):
+        """
+        Updates the parameters of the density representer.
+        """
+        raise NotImplementedError("Must be overridden.")
+
+
+    def state_dict(self):
+        """
+        Returns the internal state of the update rule as a dictionary. Stateless update rules return an empty dictionary.
+        """
+        return {}
+
+
+    def load_state_dict(self,
+                        state_dict:dict # A dictionary that was created with `state_dict`.
+                       ):
+        """
+        Restores the internal state of the update rule. Needs to be called after `setup`.
+        """
+        pass
+
+# Cell
+class AdamUpdateRule(UpdateRule):
+    """
+    Updates all parameters of the density representer with `torch.optim.Adam`. This is the default update rule of SIMP.
+    """
+    def __init__(self,
+                 lr:float=3e-2 # The learning rate of the `torch.optim.Adam` optimizer.
+                ):
+        self.lr = lr
+
+
+    def _setup(self):
+        self.optimizer = torch.optim.Adam(self.density_representer.parameters(), lr=self.lr)
+
+
+    def step(self,
+             loss:torch.Tensor # The loss of the current SIMP iteration.
+            ):
+        """
+        Performs a gradient step with `torch.optim.Adam`.
+        """
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+
+
+    def state_dict(self):
+        return self.optimizer.state_dict()
+
+
+    def load_state_dict(self, state_dict):
+        self.optimizer.load_state_dict(state_dict)
+
+# Internal Cell
+class LatentDensityUpdateRule(UpdateRule):
+    """
+    A parent class for update rules that minimize the loss subject to a volume constraint by directly updating the latent density distribution `θ` of a `FilteringDensityRepresenter`.
+    The sensitivities are computed with respect to the latent density, i.e., they already contain the adjoint of the density filter.
+    """
+    def __init__(self, max_volume_fraction, move, bisection_tol):
+        self.max_volume_fraction = max_volume_fraction
+        self.move = move
+        self.bisection_tol = bisection_tol
+
+
+    def _setup(self):
+        if not isinstance(getattr(self.density_representer, 'θ', None), torch.nn.Parameter):
+            raise ValueError(f"{type(self).__name__}: The density representer needs to have a latent density θ, e.g., a FilteringDensityRepresenter.")
+
+
+    def _get_sensitivities(self, loss):
+        θ = self.density_representer.θ
+        θ.grad = None
+        loss.backward()
+        dc = θ.grad.detach().clone()
+        volume = self.volume_fct().sum()
+        dv, = torch.autograd.grad(volume, θ)
+        θ.grad = None
+        return dc, volume.item(), dv
+
+
+    def _get_volume(self, θ_new):
+        with torch.no_grad():
+            self.density_representer.θ.data = θ_new
+            return self.volume_fct().sum().item()
+
+
+    def _bisect(self, get_volume, λ_scale):
+        λ_low, λ_high = 1e-10 * λ_scale, 1e10 * λ_scale
+        if get_volume(λ_low) <= self.max_volume_fraction:
+            return λ_low
+        while λ_high / λ_low > 1 + self.bisection_tol:
+            λ = math.sqrt(λ_low * λ_high)
+            if get_volume(λ) > self.max_volume_fraction:
+                λ_low = λ
+            else:
+                λ_high = λ
+        return λ_high
+
+# Cell
+class OCUpdateRule(LatentDensityUpdateRule):
+    """
+    Updates the latent density with the classical optimality criteria (OC) method [1], i.e., a fixed-point update for the minimization of the loss subject to a volume constraint.
+    The Lagrange multiplier of the volume constraint is found by bisection, such that each update meets the maximum volume fraction. Works best for compliance minimization.
+
+    [1] Bendsøe, M. P., & Sigmund, O. (2003). Topology optimization: theory, methods, and applications. Springer.
+    """
+    def __init__(self,
+                 max_volume_fraction:float=.2, # The maximum volume fraction of the density, given as a float between 0 and 1.
+                 move:float=.2, # The maximum change of the latent density per iteration.
+                 η:float=.5, # The damping exponent of the fixed-point update.
+                 θ_min:float=1e-3, # The minimal latent density. Must be positive, since the OC update is multiplicative.
+                 bisection_tol:float=1e-3 # The relative tolerance of the bisection for the Lagrange multiplier.
+                ):
+        super().__init__(max_volume_fraction=max_volume_fraction, move=move, bisection_tol=bisection_tol)
+        self.η = η
+        self.θ_min = θ_min
+
+
+    def step(self,
+             loss:torch.Tensor # The loss of the current SIMP iteration.
+            ):
+        """
+        Performs an OC update of the latent density.
+        """
+        θ = self.density_representer.θ.data.clone().clamp(self.θ_min, 1)
+        dc, _, dv = self._get_sensitivities(loss)
+        dc = (-dc).clamp(min=0)
+        dv = dv.clamp(min=1e-12)
+
+        def get_θ_new(λ):
+            θ_new = θ * (dc / (λ * dv)) ** self.η
+            return torch.min(torch.max(θ_new, θ - self.move), θ + self.move).clamp(self.θ_min, 1)
+
+        λ_scale = max(dc.sum().item() / dv.sum().item(), 1e-30)
+        λ = self._bisect(lambda λ: self._get_volume(get_θ_new(λ)), λ_scale)
+        self.density_representer.θ.data = get_θ_new(λ)
+
+# Cell
+class MMAUpdateRule(LatentDensityUpdateRule):
+    """
+    Updates the latent density with the method of moving asymptotes (MMA) [1] for the minimization of the loss subject to a volume constraint.
+    The convex separable subproblem is solved in its dual, where the single Lagrange multiplier of the volume constraint is found by bisection.
+
+    [1] Svanberg, K. (1987). The method of moving asymptotes—a new method for structural optimization. International Journal for Numerical Methods in Engineering, 24(2), 359-373.
+    """
+    def __init__(self,
+                 max_volume_fraction:float=.2, # The maximum volume fraction of the density, given as a float between 0 and 1.
+                 move:float=.5, # The maximum change of the latent density per iteration.
+                 asymptote_init:float=.5, # The initial distance of the asymptotes from the latent density.
+                 asymptote_increase:float=1.2, # The factor by which the asymptotes are widened for non-oscillating latent densities.
+                 asymptote_decrease:float=.7, # The factor by which the asymptotes are narrowed for oscillating latent densities.
+                 bisection_tol:float=1e-3 # The relative tolerance of the bisection for the Lagrange multiplier.
+                ):
+        super().__init__(max_volume_fraction=max_volume_fraction, move=move, bisection_tol=bisection_tol)
+        self.asymptote_init = asymptote_init
+        self.asymptote_increase = asymptote_increase
+        self.asymptote_decrease = asymptote_decrease
+
+
+    def _setup(self):
+        super()._setup()
+        self.θ_old1, self.θ_old2 = None, None
+        self.low, self.upp = None, None
+
+
+    def _update_asymptotes(self, θ):
+        if self.θ_old2 is None:
+            self.low = θ - self.asymptote_init
+            self.upp = θ + self.asymptote_init
+        else:
+            oscillation = (θ - self.θ_old1) * (self.θ_old1 - self.θ_old2)
+            factor = torch.ones_like(θ)
+            factor[oscillation > 0] = self.asymptote_increase
+            factor[oscillation < 0] = self.asymptote_decrease
+            self.low = θ - factor * (self.θ_old1 - self.low)
+            self.upp = θ + factor * (self.upp - self.θ_old1)
+            self.low = torch.max(torch.min(self.low, θ - .01), θ - 10.)
+            self.upp = torch.min(torch.max(self.upp, θ + .01), θ + 10.)
+        self.θ_old2, self.θ_old1 = self.θ_old1, θ
+
+
+    def state_dict(self):
+        return {"θ_old1": self.θ_old1, "θ_old2": self.θ_old2, "low": self.low, "upp": self.upp}
+
+
+    def load_state_dict(self, state_dict):
+        self.θ_old1, self.θ_old2 = state_dict["θ_old1"], state_dict["θ_old2"]
+        self.low, self.upp = state_dict["low"], state_dict["upp"]
+
+
+    def step(self,
+             loss:torch.Tensor # The loss of the current SIMP iteration.
+            ):
+        """
+        Solves the MMA subproblem and updates the latent density with its solution.
+        """
+        θ = self.density_representer.θ.data.clone()
+        dc, volume, dv = self._get_sensitivities(loss)
+        dc = dc / dc.abs().max().clamp(min=1e-30)
+        self._update_asymptotes(θ)
+
+        α = torch.max(self.low + .1 * (θ - self.low), θ - self.move).clamp(min=0)
+        β = torch.min(self.upp - .1 * (self.upp - θ), θ + self.move).clamp(max=1)
+        upp_dist, low_dist = self.upp - θ, θ - self.low
+        p0 = upp_dist ** 2 * (1.001 * dc.clamp(min=0) + .001 * (-dc).clamp(min=0) + 1e-5)
+        q0 = low_dist ** 2 * (.001 * dc.clamp(min=0) + 1.001 * (-dc).clamp(min=0) + 1e-5)
+        p1 = upp_dist ** 2 * dv.clamp(min=0)
+        q1 = low_dist ** 2 * (-dv).clamp(min=0)
+        volume_offset = volume - (p1 / upp_dist + q1 / low_dist).sum().item()
+
+        def get_θ_new(λ):
+            P, Q = (p0 + λ * p1).sqrt(), (q0 + λ * q1).sqrt()
+            θ_new = (P * self.low + Q * self.upp) / (P + Q)
+            return torch.min(torch.max(θ_new, α), β)
+
+        def get_approximated_volume(λ):
+            θ_new = get_θ_new(λ)
+            return volume_offset + (p1 / (self.upp - θ_new) + q1 / (θ_new - self.low)).sum().item()
+
+        λ_scale = max((p0 + q0).sum().item() / (p1 + q1).sum().item(), 1e-30)
+        λ = self._bisect(get_approximated_volume, λ_scale)
+        self.density_representer.θ.data = get_θ_new(λ)
+
+# Cell
+class SIMPLoggingPolicy:
+    """
+    Determines which metrics are logged by the SIMP iterator, in which iterations they are logged and whether they are kept as tensors until the logs are materialized.
+    Deferring the materialization avoids a host synchronization for every metric in every iteration. The default policy logs all metrics as floats in every iteration.
+    """
+    all_metrics = ("losses", "max_density_changes", "volumes", "durations", "binarinesses", "relative_max_σ_vm")
+    scalar_metrics = ("losses", "max_density_changes", "volumes", "relative_max_σ_vm")
+
+    def __init__(self,
+                 interval:int=1, # The metrics are logged in every `interval`-th iteration, starting with the first iteration.
+                 metrics:list=None, # The names of the logged metrics. Possible options are "losses", "max_density_changes", "volumes", "durations", "binarinesses" and "relative_max_σ_vm". If `None`, then all metrics are logged.
+                 deferred:bool=False # Whether to keep the logged values as tensors until `materialize` is called, instead of converting them to floats in every iteration.
+                ):
+        if interval < 1:
+            raise ValueError("SIMPLoggingPolicy: interval must be at least 1.")
+        self.interval = interval
+        self.metrics = set(self.all_metrics if metrics is None else metrics)
+        unknown_metrics = self.metrics - set(self.all_metrics)
+        if len(unknown_metrics) > 0:
+            raise ValueError(f"SIMPLoggingPolicy: Unknown metrics {sorted(unknown_metrics)}.")
+        self.deferred = deferred
+
+
+    def is_logging_iteration(self,
+                             iteration:int # The index of the current iteration, starting at 0.
+                            ):
+        """
+        Returns whether the metrics are logged in the given iteration.
+        """
+        return iteration % self.interval == 0
+
+
+    def materialize(self,
+                    logs:dict # The logs of a SIMP iterator.
+                   ):
+        """
+        Converts all deferred tensor values in `logs` to floats, with a single host synchronization per metric.
+        """
+        for name in self.scalar_metrics:
+            values = logs.get(name, [])
+            indices = [i for i, value in enumerate(values) if isinstance(value, torch.Tensor)]
+            if len(indices) > 0:
+                floats = torch.stack([values[i].reshape(()) for i in indices]).tolist()
+                for i, value in zip(indices, floats):
+                    values[i] = value
+
+# Cell
+import os
+import json
+import warnings
+import zlib
+import hashlib
 import torch
 import numpy as np
+from typing import Union
+from collections.abc import Sequence
 from tqdm import tqdm
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
-from .topo_solvers import TopoSolver, SIMPIterator
-from .density_representers import FilteringDensityRepresenter
+from .topo_solvers import TopoSolver, SIMPIterator, BatchedSIMPIterator, SIMPLoggingPolicy, describe_config, describe_constructor_args
+from .solution import Solution
+from .density_representers import FilteringDensityRepresenter, BatchedFilteringDensityRepresenter
 
 # Cell
 class SIMP(TopoSolver):
@@ -606,10 +1485,25 @@ class SIMP(TopoSolver):
         p:float=3., # The SIMP exponent to discourage non-binary densities. The default value is `p=3`, which is the standard value in the literature.
         n_iterations:int=50, # The number of SIMP iterations that should be performed.
         verbose:bool=True, # Whether to give the user feedback on the current status of the optimization.
-        lr:float=3e-2, # The learning rate of the `torch.optim.Adam` optimizer.
+        lr:float=3e-2, # The learning rate of the `torch.optim.Adam` optimizer. Only used if no `update_rule` is given.
         binarizer_steepening_factor:float=1., # The factor at which the binarizer should be steepened in each iteration. E.g.,a value of 1.1 corresponds to a steepening of 10% per iteration.
         density_representer:"dl4to.density_representers.DensityRepresenter"=FilteringDensityRepresenter(), # The density representer that is used for the latent density representation. The density representer also performs the projection, smoothing and filtering.
-        return_intermediate_solutions:bool=False # Whether intermediate SIMP solutions should be returned or only the final solution of the optimization process.
+        return_intermediate_solutions:bool=False, # Whether intermediate SIMP solutions should be returned or only the final solution of the optimization process.
+        n_levels:int=1, # The number of resolution levels. For `n_levels>1`, the problem is first solved on a grid that is coarsened by a factor of `2**(n_levels-1)` and the density is then prolonged to the next finer level. The filter size of the density representer is scaled with the grid spacing of each level, such that the filter covers the same physical length on all levels. Levels that would be too coarse for the PDE solver are skipped.
+        level_iteration_factor:float=.5, # The factor by which the number of iterations is reduced on each finer resolution level. The coarsest level uses `n_iterations` iterations.
+        loss_tol:float=None, # If given, the optimization is only considered converged if the relative change of the loss between two iterations is below `loss_tol`.
+        density_change_tol:float=None, # If given, the optimization is only considered converged if the maximal change of the density between two iterations is below `density_change_tol`.
+        min_binariness:float=None, # If given, the optimization is only considered converged if the binariness of the density is at least `min_binariness`.
+        max_volume_fraction:float=None, # If given, the optimization is only considered converged if the volume fraction of the density is at most `max_volume_fraction`.
+        patience:int=5, # The number of consecutive optimizer iterations in which the convergence conditions need to hold until SIMP stops early. The conditions are checked in logged iterations, and with `n_levels>1` the count restarts on each level. Early stopping is only used if at least one of the convergence conditions is given.
+        update_rule:"dl4to.topo_solvers.UpdateRule"=None, # The rule that updates the density representer in each iteration, e.g., `OCUpdateRule` or `MMAUpdateRule` for compliance minimization with a volume constraint. If `None`, then `torch.optim.Adam` with learning rate `lr` is used.
+        batch_size:int=1, # The maximal number of problems with the same shape that are optimized in lockstep with a stacked latent density, a single filter convolution, a single optimizer and concurrent PDE solves. Requires a `FilteringDensityRepresenter` and `n_levels=1`.
+        logging_policy:"dl4to.topo_solvers.SIMPLoggingPolicy"=None, # Determines which metrics are logged in which iterations and whether they are materialized in bulk after the optimization. If `None`, then all metrics are logged in every iteration.
+        trajectory_options:dict=None, # If given and `return_intermediate_solutions=True`, then the intermediate solutions of each problem are returned as a compact `SIMPTrajectory` that is created with these keyword arguments, e.g., `dict(stride=5, dtype='uint8', delta_encoding=True)`. Not supported for `n_levels>1`.
+        checkpoint_dir:str=None, # If given, a snapshot of the optimization state is saved to this directory every `checkpoint_interval` iterations, and an interrupted optimization of the same problems is resumed from its latest snapshot. The snapshot is removed once the optimization is finished. Not supported for `n_levels>1`.
+        checkpoint_interval:int=10, # The number of iterations between two snapshots of the optimization state.
+        warm_start:Union[str,"dl4to.topo_solvers.TopoSolver"]=None, # Determines the initialization of the latent density. If `None`, then the latent density is initialized with a constant. If "solutions", then the densities of the given solution objects are used. If a topo solver is given, e.g., a trained `TrainableTopoSolver`, then the densities that it predicts for the problems are used. Requires a density representer with a `set_density` method, such as `FilteringDensityRepresenter`.
+        warm_start_iterations:int=50 # The number of iterations that are used to fit the latent density to the initial densities, i.e., to invert the density filter.
     ):
         super().__init__(device="cpu", name="SIMP")
         self.p = p
@@ -621,18 +1515,147 @@ class SIMP(TopoSolver):
         self.binarizer_steepening_factor = binarizer_steepening_factor
         self.lr = lr
         self.criterion = criterion
+        if n_levels < 1:
+            raise ValueError("SIMP: n_levels must be at least 1.")
+        if n_levels > 1 and not hasattr(density_representer, 'set_latent_θ'):
+            raise ValueError(f"SIMP: The density representer {type(density_representer).__name__} does not support multiple resolution levels.")
+        self.n_levels = n_levels
+        self.level_iteration_factor = level_iteration_factor
+        self.loss_tol = loss_tol
+        self.density_change_tol = density_change_tol
+        self.min_binariness = min_binariness
+        self.max_volume_fraction = max_volume_fraction
+        self.patience = patience
+        self.update_rule = update_rule
+        if batch_size > 1 and (n_levels > 1 or not isinstance(density_representer, FilteringDensityRepresenter)):
+            raise ValueError("SIMP: Batches of problems are only supported for a FilteringDensityRepresenter and n_levels=1.")
+        self.batch_size = batch_size
+        if trajectory_options is not None and n_levels > 1:
+            raise ValueError("SIMP: Trajectories are not supported for n_levels>1.")
+        self.trajectory_options = trajectory_options
+        if checkpoint_dir is not None:
+            if n_levels > 1:
+                raise ValueError("SIMP: Checkpoints are not supported for n_levels>1.")
+            if return_intermediate_solutions and trajectory_options is None:
+                raise ValueError("SIMP: Intermediate solutions can only be checkpointed if they are stored as trajectories, i.e., if trajectory_options are given.")
+            if checkpoint_interval < 1:
+                raise ValueError("SIMP: checkpoint_interval must be at least 1.")
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_interval = checkpoint_interval
+        if warm_start is not None:
+            if not (warm_start == "solutions" or isinstance(warm_start, TopoSolver)):
+                raise ValueError("SIMP: warm_start needs to be None, \"solutions\" or a topo solver.")
+            if not hasattr(density_representer, 'set_density'):
+                raise ValueError(f"SIMP: The density representer {type(density_representer).__name__} does not support warm starts.")
+        self.warm_start = warm_start
+        self.warm_start_iterations = warm_start_iterations
+        self.logging_policy = SIMPLoggingPolicy() if logging_policy is None else logging_policy
+        required_metrics = {
+            "losses": loss_tol, "max_density_changes": density_change_tol,
+            "binarinesses": min_binariness, "volumes": max_volume_fraction
+        }
+        missing_metrics = [name for name, condition in required_metrics.items() if condition is not None and name not in self.logging_policy.metrics]
+        if len(missing_metrics) > 0:
+            raise ValueError(f"SIMP: The convergence conditions require the metrics {missing_metrics} to be logged.")
+
+
+    @property
+    def uses_early_stopping(self):
+        convergence_conditions = [self.loss_tol, self.density_change_tol, self.min_binariness, self.max_volume_fraction]
+        return any(condition is not None for condition in convergence_conditions)
+
 
+    def _get_n_logs(self, logs):
+        return max(len(logs[name]) for name in self.logging_policy.metrics)
 
-    def _run_iterations(self, simp_iterator):
+
+    def _is_converged(self, logs, n_previous_logs=0):
+        if self._get_n_logs(logs) - n_previous_logs < 2:
+            return False
+        if self.loss_tol is not None:
+            loss, previous_loss = float(logs["losses"][-1]), float(logs["losses"][-2])
+            if abs(loss - previous_loss) > self.loss_tol * max(abs(previous_loss), 1e-12):
+                return False
+        if self.density_change_tol is not None and float(logs["max_density_changes"][-1]) > self.density_change_tol:
+            return False
+        if self.min_binariness is not None and float(logs["binarinesses"][-1]) < self.min_binariness:
+            return False
+        if self.max_volume_fraction is not None and float(logs["volumes"][-1]) > self.max_volume_fraction:
+            return False
+        return True
+
+
+    def _get_checkpointer(self, problems):
+        if self.checkpoint_dir is None:
+            return None
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        config = json.dumps(self._get_cache_config(), sort_keys=True, default=str)
+        key = hashlib.sha256((config + "".join(problem.get_fingerprint() for problem in problems)).encode()).hexdigest()
+        return SIMPCheckpointer(path=os.path.join(self.checkpoint_dir, f"simp_{key[:32]}.pt"), interval=self.checkpoint_interval, config=config)
+
+
+    def _run_iterations(self, simp_iterator, n_iterations=None):
         solutions = []
-        iters = range(self.n_iterations)
+        n_iterations = self.n_iterations if n_iterations is None else n_iterations
+        is_batched = type(simp_iterator.logs) == list
+        all_logs = simp_iterator.logs if is_batched else [simp_iterator.logs]
+        problems = simp_iterator.problems if is_batched else [simp_iterator.problem]
+        trajectories = None
+        if self.return_intermediate_solutions and self.trajectory_options is not None:
+            trajectories = [SIMPTrajectory(problem=problem, **self.trajectory_options) for problem in problems]
+        n_converged_iterations = [0] * len(all_logs)
+        n_previous_logs = [self._get_n_logs(logs) for logs in all_logs]
+        for logs in all_logs:
+            logs["stop_reason"] = "max_iterations"
+
+        checkpointer = self._get_checkpointer(problems)
+        checkpoint = None if checkpointer is None else checkpointer.load()
+        if checkpoint is not None:
+            simp_iterator.load_state_dict(checkpoint["simp_iterator"])
+            n_converged_iterations = checkpoint["n_converged_iterations"]
+            n_previous_logs = checkpoint["n_previous_logs"]
+            if trajectories is not None:
+                trajectories = [SIMPTrajectory.from_state_dict(state_dict, problem=problem) for state_dict, problem in zip(checkpoint["trajectories"], problems)]
+
+        last_checked_iteration = simp_iterator.iteration if checkpoint is None else checkpoint["last_checked_iteration"]
+        iters = range(simp_iterator.iteration, n_iterations)
         if self.verbose:
             iters = tqdm(iters)
-
-        for i in iters:
-            solution = simp_iterator(p=self.p)
-            if self.return_intermediate_solutions:
-                solutions.append(solution)
+        is_finished = False
+        try:
+            for i in iters:
+                solution = simp_iterator(p=self.p)
+                if trajectories is not None:
+                    for trajectory, problem_solution in zip(trajectories, solution if is_batched else [solution]):
+                        trajectory.append(problem_solution.θ)
+                elif self.return_intermediate_solutions:
+                    solutions.append(solution)
+                if self.uses_early_stopping and simp_iterator.logged_last_iteration:
+                    n_checked_iterations = simp_iterator.iteration - last_checked_iteration
+                    last_checked_iteration = simp_iterator.iteration
+                    n_converged_iterations = [n + n_checked_iterations if self._is_converged(logs, n_logs) else 0 for n, logs, n_logs in zip(n_converged_iterations, all_logs, n_previous_logs)]
+                    if min(n_converged_iterations) >= self.patience:
+                        for logs in all_logs:
+                            logs["stop_reason"] = "converged"
+                        break
+                if checkpointer is not None and checkpointer.is_checkpoint_iteration(simp_iterator.iteration, n_iterations):
+                    checkpointer.save({
+                        "simp_iterator": simp_iterator.state_dict(),
+                        "n_converged_iterations": list(n_converged_iterations),
+                        "n_previous_logs": list(n_previous_logs),
+                        "last_checked_iteration": last_checked_iteration,
+                        "trajectories": None if trajectories is None else [trajectory.state_dict() for trajectory in trajectories]
+                    })
+            is_finished = True
+        finally:
+            if checkpointer is not None:
+                checkpointer.close(remove=is_finished)
+        for logs in all_logs:
+            self.logging_policy.materialize(logs)
+        if trajectories is not None:
+            for trajectory, logs in zip(trajectories, all_logs):
+                trajectory.logs = logs
+            return trajectories if is_batched else trajectories[0]
         if self.return_intermediate_solutions:
             return solutions
         return solution
@@ -642,42 +1665,386 @@ class SIMP(TopoSolver):
         self.density_representer.reset_binarizer()
 
 
-    def _get_new_simp_iterator(self, solution, density_representer):
+    def _get_cache_keys(self, solutions):
+        keys = super()._get_cache_keys(solutions)
+        if self.warm_start == "solutions":
+            keys = [hashlib.sha256((key + describe_config(solution.θ)["sha256"]).encode()).hexdigest() for key, solution in zip(keys, solutions)]
+        return keys
+
+
+    def _get_cache_config(self):
+        config = describe_constructor_args(self, exclude={"verbose", "density_representer", "checkpoint_dir", "checkpoint_interval"})
+        config["density_representer"] = describe_constructor_args(self.density_representer, exclude={"problem", "binarizer_strength"})
+        config["density_representer"]["binarizer_strength"] = self.density_representer.binarizer_strength_init
+        return config
+
+
+    def _get_new_simp_iterator(self, problem, density_representer):
         simp_iterator = SIMPIterator(
-            problem=solution.problem,
+            problem=problem,
             criterion=self.criterion,
             density_representer=self.density_representer,
             lr=self.lr,
-            binarizer_steepening_factor=self.binarizer_steepening_factor
+            binarizer_steepening_factor=self.binarizer_steepening_factor,
+            update_rule=self.update_rule,
+            logging_policy=self.logging_policy
         )
         return simp_iterator
 
 
+    def _get_problem_hierarchy(self, problem):
+        problems = [problem]
+        for _ in range(self.n_levels - 1):
+            if min((s + 1) // 2 for s in problems[0].shape) < 3:
+                break
+            problems.insert(0, problems[0].coarsen(factor=2))
+        return problems
+
+
+    def _get_level_filter_size(self, filter_size, factor):
+        if factor == 1:
+            return filter_size
+        return max(1, 2 * round((filter_size / factor - 1) / 2) + 1)
+
+
+    def _prolong_density_representer(self, problem):
+        θ = self.density_representer.θ.data
+        binarizer_strength = self.density_representer.binarizer_strength
+        self.density_representer.problem = problem
+        self.density_representer.set_latent_θ(θ)
+        self.density_representer.binarizer_strength = binarizer_strength
+
+
+    def _warm_start_density_representer(self, density_representer, θ):
+        if self.warm_start is not None:
+            density_representer.set_density(θ, n_iterations=self.warm_start_iterations)
+
+
+    def _get_new_multilevel_solution(self, problems, θ_init):
+        logs = defaultdict(list)
+        solutions = []
+        filter_size = self.density_representer.filter_size
+        try:
+            for level, problem in enumerate(problems):
+                n_iterations = max(1, round(self.n_iterations * self.level_iteration_factor ** level))
+                self.density_representer.filter_size = self._get_level_filter_size(filter_size, 2 ** (len(problems) - 1 - level))
+                if level == 0:
+                    self.density_representer.problem = problem
+                    self._warm_start_density_representer(self.density_representer, θ_init)
+                else:
+                    self._prolong_density_representer(problem)
+                simp_iterator = self._get_new_simp_iterator(problem, self.density_representer)
+                simp_iterator.logs = logs
+                solution = self._run_iterations(simp_iterator, n_iterations)
+                logs["resolution_levels"].extend([level] * simp_iterator.n_logged_iterations)
+                if self.return_intermediate_solutions:
+                    solutions.extend(solution)
+        finally:
+            self.density_representer.filter_size = filter_size
+        if self.return_intermediate_solutions:
+            return solutions
+        return solution
+
+
     def _get_new_solution(self, solution):
+        problems = self._get_problem_hierarchy(solution.problem)
+        if len(problems) > 1:
+            return self._get_new_multilevel_solution(problems, solution.θ)
         self.density_representer.problem = solution.problem
-        simp_iterator = self._get_new_simp_iterator(solution, self.density_representer)
+        self._warm_start_density_representer(self.density_representer, solution.θ)
+        simp_iterator = self._get_new_simp_iterator(solution.problem, self.density_representer)
         solution = self._run_iterations(simp_iterator)
         return solution
 
 
-    def _get_new_solutions(self, solutions, density_representers):
-        solutions, density_representers = self._check_and_preprocess_inputs_for_get_new_solutions(solutions, density_representers)
-        simp_solutions = []
-        for solution in solutions:
-            if self.return_intermediate_solutions:
-                simp_solutions.extend([self._get_new_solution(solution)])
+    def _get_batches(self, solutions):
+        indices_per_shape = defaultdict(list)
+        for i, solution in enumerate(solutions):
+            indices_per_shape[tuple(solution.problem.shape)].append(i)
+        batches = []
+        for indices in indices_per_shape.values():
+            batches.extend(indices[i:i + self.batch_size] for i in range(0, len(indices), self.batch_size))
+        return batches
+
+
+    def _get_new_batched_solutions(self, solutions):
+        problems = [solution.problem for solution in solutions]
+        density_representer = BatchedFilteringDensityRepresenter(
+            problems=problems,
+            filter_size=self.density_representer.filter_size,
+            filter_fct=self.density_representer.filter_fct,
+            binarizer_strength=self.density_representer.binarizer_strength_init,
+            θ_default=self.density_representer.θ_default
+        )
+        self._warm_start_density_representer(density_representer, torch.stack([solution.θ for solution in solutions]))
+        simp_iterator = BatchedSIMPIterator(
+            problems=problems,
+            criterion=self.criterion,
+            density_representer=density_representer,
+            lr=self.lr,
+            binarizer_steepening_factor=self.binarizer_steepening_factor,
+            update_rule=self.update_rule,
+            logging_policy=self.logging_policy
+        )
+        solutions = self._run_iterations(simp_iterator)
+        if self.return_intermediate_solutions and self.trajectory_options is None:
+            return [list(intermediate_solutions) for intermediate_solutions in zip(*solutions)]
+        return solutions
+
+
+    def _get_new_solutions(self, solutions, eval_mode):
+        if isinstance(self.warm_start, TopoSolver):
+            solutions = self.warm_start([solution.problem for solution in solutions])
+        simp_solutions = [None] * len(solutions)
+        for batch in self._get_batches(solutions):
+            if len(batch) == 1:
+                new_solutions = [self._get_new_solution(solutions[batch[0]])]
             else:
-                simp_solutions.append(self._get_new_solution(solution))
+                new_solutions = self._get_new_batched_solutions([solutions[i] for i in batch])
+            for i, new_solution in zip(batch, new_solutions):
+                simp_solutions[i] = new_solution
         return simp_solutions
 
+# Internal Cell
+class SIMPCheckpointer:
+    """
+    Saves snapshots of a SIMP optimization to a single file. The snapshots are written in a background thread, such that the optimization only waits if the previous snapshot has not been written yet.
+    Every snapshot stores the SIMP configuration `config`, and snapshots of a different configuration are ignored when loading.
+    """
+    def __init__(self, path, interval, config):
+        self.path = path
+        self.interval = interval
+        self.config = config
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._future = None
+
+
+    def is_checkpoint_iteration(self, iteration, n_iterations):
+        return iteration % self.interval == 0 and iteration < n_iterations
+
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        state = torch.load(self.path)
+        if state.get("config") != self.config:
+            warnings.warn(f"SIMPCheckpointer: Ignoring the snapshot {self.path}, since it was created with a different SIMP configuration.")
+            return None
+        return state
+
+
+    def _write(self, state):
+        tmp_path = self.path + '.tmp'
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, self.path)
+
+
+    def wait(self):
+        if self._future is not None:
+            self._future.result()
+            self._future = None
+
+
+    def save(self, state):
+        self.wait()
+        self._future = self._executor.submit(self._write, {**state, "config": self.config})
+
+
+    def close(self, remove):
+        self.wait()
+        self._executor.shutdown()
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
+
+# Cell
+class SIMPTrajectory(Sequence):
+    """
+    A compact container for the intermediate SIMP solutions of a single problem. Only every `stride`-th density is stored, the densities are quantized and they can optionally be delta encoded.
+    The `dl4to.solution.Solution` objects are only reconstructed when they are accessed.
+    """
+    integer_dtypes = {'uint8': np.uint8, 'float16': np.uint16, 'float32': np.uint32}
+
+    def __init__(self,
+                 problem:"dl4to.problem.Problem"=None, # The problem to which the intermediate solutions belong.
+                 stride:int=1, # Only every `stride`-th density is stored. The last appended density is always stored.
+                 dtype:str='uint8', # The precision in which the densities are stored. Possible options are "uint8", which quantizes the densities to 256 levels, "float16" and "float32".
+                 delta_encoding:bool=False, # Whether to store the zlib-compressed differences between consecutive stored densities instead of the densities themselves.
+                 keyframe_interval:int=10 # If `delta_encoding=True`, every `keyframe_interval`-th stored density is stored in full, which bounds the cost of reconstructing a density.
+                ):
+        if dtype not in self.integer_dtypes:
+            raise ValueError(f"SIMPTrajectory: Unknown dtype {dtype}.")
+        self.problem = problem
+        self.stride = stride
+        self.dtype = dtype
+        self.delta_encoding = delta_encoding
+        self.keyframe_interval = keyframe_interval
+        self.logs = None
+        self.shape = None
+        self._iterations = []
+        self._frames = []
+        self._n_appended = 0
+        self._pending = None
+        self._previous = None
+        self._cached = (None, None)
+
+
+    def _quantize(self, θ):
+        θ = θ.detach().cpu().float().reshape(-1)
+        if self.dtype == 'uint8':
+            return (θ * 255).round().to(torch.uint8).numpy()
+        if self.dtype == 'float16':
+            return θ.half().numpy().view(np.uint16)
+        return θ.numpy().view(np.uint32).copy()
+
+
+    def _dequantize(self, q):
+        if self.dtype == 'uint8':
+            θ = q.astype(np.float32) / 255
+        elif self.dtype == 'float16':
+            θ = q.view(np.float16).astype(np.float32)
+        else:
+            θ = q.view(np.float32).copy()
+        return torch.from_numpy(θ).reshape(self.shape)
+
+
+    def _store(self, iteration, q):
+        is_keyframe = len(self._frames) % self.keyframe_interval == 0
+        if self.delta_encoding:
+            data = q if is_keyframe else q - self._previous
+            frame = zlib.compress(data.tobytes(), 1)
+        else:
+            frame = q.tobytes()
+        self._frames.append(torch.frombuffer(bytearray(frame), dtype=torch.uint8))
+        self._iterations.append(iteration)
+        self._previous = q
+
+
+    def _flush(self):
+        if self._pending is not None:
+            self._store(*self._pending)
+            self._pending = None
+
+
+    def append(self,
+               θ:torch.Tensor # The density of the current SIMP iteration.
+              ):
+        """
+        Appends the density of the next SIMP iteration to the trajectory.
+        """
+        if self.shape is None:
+            self.shape = tuple(θ.shape)
+        iteration = self._n_appended
+        self._n_appended += 1
+        q = self._quantize(θ)
+        if iteration % self.stride == 0:
+            self._pending = None
+            self._store(iteration, q)
+        else:
+            self._pending = (iteration, q)
+
 
-    def _check_and_preprocess_inputs_for_get_new_solutions(self, solutions, density_representers):
-        if type(density_representers) != list:
-            density_representers = [density_representers]
+    def _read_frame(self, i):
+        data = self._frames[i].numpy().tobytes()
+        if self.delta_encoding:
+            data = zlib.decompress(data)
+        return np.frombuffer(data, dtype=self.integer_dtypes[self.dtype])
 
-        if len(solutions) == len(density_representers):
-            return solutions, density_representers
-        raise ValueError("SIMP: len(solutions) != len(density_representers)")
+
+    def _decode(self, i):
+        cached_i, cached_q = self._cached
+        if cached_i == i:
+            return cached_q
+        if not self.delta_encoding:
+            q = self._read_frame(i)
+        else:
+            keyframe = i - i % self.keyframe_interval
+            if cached_i is not None and keyframe <= cached_i < i:
+                start, q = cached_i + 1, cached_q
+            else:
+                start, q = keyframe + 1, self._read_frame(keyframe)
+            for j in range(start, i + 1):
+                q = q + self._read_frame(j)
+        self._cached = (i, q)
+        return q
+
+
+    def get_θ(self,
+              i:int # The index of the stored density.
+             ):
+        """
+        Returns the `i`-th stored density of the trajectory.
+        """
+        self._flush()
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"SIMPTrajectory: Index {i} is out of range.")
+        θ = self._dequantize(self._decode(i))
+        if self.problem is not None:
+            θ = θ.type(self.problem.dtype)
+        return θ
+
+
+    @property
+    def iterations(self):
+        """
+        The SIMP iterations of the stored densities.
+        """
+        return self._iterations + ([self._pending[0]] if self._pending is not None else [])
+
+
+    def __len__(self):
+        return len(self._frames) + int(self._pending is not None)
+
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        solution = Solution(problem=self.problem, θ=self.get_θ(i))
+        solution.logs = self.logs
+        return solution
+
+
+    @property
+    def nbytes(self):
+        """
+        The number of bytes occupied by the stored densities.
+        """
+        self._flush()
+        return sum(frame.numel() for frame in self._frames)
+
+
+    def state_dict(self):
+        """
+        Returns the stored densities and the storage settings of the trajectory as a dictionary, e.g., for saving it with `torch.save`. The problem and the logs are not contained.
+        """
+        pending = None if self._pending is None else (self._pending[0], torch.from_numpy(self._pending[1].copy()))
+        return {
+            'stride': self.stride, 'dtype': self.dtype, 'delta_encoding': self.delta_encoding, 'keyframe_interval': self.keyframe_interval,
+            'shape': None if self.shape is None else list(self.shape), 'iterations': list(self._iterations), 'frames': list(self._frames),
+            'n_appended': self._n_appended, 'pending': pending
+        }
+
+
+    @classmethod
+    def from_state_dict(cls,
+                        state_dict:dict, # A dictionary that was created with `SIMPTrajectory.state_dict`.
+                        problem:"dl4to.problem.Problem"=None # The problem to which the intermediate solutions belong.
+                       ):
+        """
+        Creates a trajectory from a dictionary that was created with `SIMPTrajectory.state_dict`.
+        """
+        trajectory = cls(problem=problem, stride=state_dict['stride'], dtype=state_dict['dtype'],
+                         delta_encoding=state_dict['delta_encoding'], keyframe_interval=state_dict['keyframe_interval'])
+        trajectory.shape = None if state_dict['shape'] is None else tuple(state_dict['shape'])
+        trajectory._iterations = list(state_dict['iterations'])
+        trajectory._frames = list(state_dict['frames'])
+        trajectory._n_appended = state_dict['n_appended']
+        if state_dict['pending'] is not None:
+            trajectory._pending = (state_dict['pending'][0], state_dict['pending'][1].numpy())
+        if len(trajectory._frames) > 0:
+            trajectory._previous = trajectory._decode(len(trajectory._frames) - 1)
+        return trajectory
 
 # Internal Cell
 import os
@@ -691,6 +2058,7 @@ from .utils import get_dataloader, cast_to_problems
 class OracleSolver(TopoSolver):
     """
     A topo solver that gets a topo dataset of problems and solutions and returns the ground truth solution for any given problem object from the dataset.
+    The problems are identified by their fingerprints, so that cloned or deserialized problem objects are found as well. The index of the dataset is built on the first call.
     """
     def __init__(self,
                  dataset:"dl4to.dataset.TopoDataset", # The dataset which is used to look for the given problem and return the assoziated ground truth solution.
@@ -699,13 +2067,28 @@ class OracleSolver(TopoSolver):
         super().__init__(device=device, name="OracleSolver")
         self.logs = defaultdict(list)
         self.dataset = dataset
+        self._index = None
+
+
+    def _get_index(self):
+        if self._index is None or self._index[0] is not self.dataset or self._index[1] != len(self.dataset):
+            index = {}
+            for i in range(len(self.dataset)):
+                index.setdefault(self.dataset[i][0].get_fingerprint(), i)
+            self._index = (self.dataset, len(self.dataset), index)
+        return self._index[2]
 
 
     def _get_new_solutions(self, solutions, eval_mode):
         problems = cast_to_problems(solutions)
 
-        problems_in_dataset = self.dataset.get_problems()
-        problem_indices = [problems_in_dataset.index(problem) for problem in problems]
+        index = self._get_index()
+        problem_indices = []
+        for problem in problems:
+            fingerprint = problem.get_fingerprint()
+            if fingerprint not in index:
+                raise ValueError(f"OracleSolver: The problem {problem.name} is not contained in the dataset.")
+            problem_indices.append(index[fingerprint])
 
         gt_solutions = [self.dataset[i][1] for i in problem_indices]
         return gt_solutions
@@ -1,46 +1,46 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: notebooks/utils/utils.ipynb (unless otherwise specified).
 
-__all__ = ['infect', 'get_current_datetime_as_string', 'create_dir', 'save_dict_as_txt', 'cast_to_problem',
-           'cast_to_solution', 'cast_to_problems', 'cast_to_solutions', 'get_dataloader', 'get_σ_vm']
+__all__ = ['label_connected_components', 'infect', 'get_current_datetime_as_string', 'create_dir', 'save_dict_as_txt',
+           'cast_to_problem', 'cast_to_solution', 'cast_to_problems', 'cast_to_solutions', 'get_dataloader', 'get_σ_vm']
 
 # Internal Cell
 import torch
+import numpy as np
+from scipy import ndimage
 
-# Internal Cell
-def _infect_step(start_points):
-    m, n, k = start_points.shape
-
-    padded = torch.zeros((2 + m, 2 + n, 2 + k), dtype=start_points.dtype, device=start_points.device)
-    padded[1:-1, 1:-1, 1:-1] = start_points
+# Cell
+def label_connected_components(infectable):
+    """
+    Labels the face-connected components of the boolean tensor `infectable` in a single pass. Voxels outside of `infectable` get the label 0, all other voxels are labeled with the positive index of their component.
+    The last three dimensions are treated as spatial dimensions. Any leading dimensions are batch dimensions along which voxels are not connected, such that a stack of volumes of shape (B,X,Y,Z) can be labeled at once with labels that are unique across the batch.
 
-    max_of_neighbors = padded[1:-1, 1:-1, 1:-1] | \
-                       padded[2:  , 1:-1, 1:-1] | \
-                       padded[ :-2, 1:-1, 1:-1] | \
-                       padded[1:-1, 2:  , 1:-1] | \
-                       padded[1:-1,  :-2, 1:-1] | \
-                       padded[1:-1, 1:-1, 2:  ] | \
-                       padded[1:-1, 1:-1,  :-2]
-    return max_of_neighbors
+    Returns
+    -------
+    torch.Tensor
+    """
+    structure = np.zeros(infectable.dim() * (3,), dtype=bool)
+    structure[(infectable.dim() - 3) * (1,)] = ndimage.generate_binary_structure(3, 1)
+    labels, _ = ndimage.label(infectable.detach().cpu().numpy(), structure=structure)
+    return torch.from_numpy(labels.astype(np.int64)).to(infectable.device)
 
 # Cell
-def infect(start_points, infectable):
+def infect(start_points, infectable, labels=None):
     """
-    An infection algorithm that starts from a set points and iteratively infects neighboring points.
+    An infection algorithm that starts from a set points and infects all points that are connected to them via infectable neighbors.
+    Instead of growing the infected region layer by layer, the connected components of `infectable` are labeled once and the components that contain a start point are selected.
+    Precomputed `labels` from `label_connected_components(infectable)` can be passed to avoid labeling the same tensor several times.
 
     Returns
     -------
     torch.Tensor
     """
-    infected_old = torch.zeros_like(start_points)
     assert start_points.dtype == infectable.dtype, f"{start_points.dtype} != {infectable.dtype}"
     assert start_points.device == infectable.device, f"{start_points.device} != {infectable.device}"
-    infected = start_points.clone() & infectable
-
-    while torch.any(infected_old != infected):
-        infected_old = infected
-        neighbors = _infect_step(infected)
-        infected = neighbors & infectable
-    return infected
+    if labels is None:
+        labels = label_connected_components(infectable)
+    infected_labels = torch.unique(labels[start_points & infectable])
+    infected = torch.isin(labels, infected_labels[infected_labels > 0])
+    return infected.type(infectable.dtype)
 
 # Internal Cell
 import os